@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark the array-backed QueueManager against the old list rebuilding
+"""
+
+import time
+from bot.queue_manager import QueueManager
+from bot.song import Song
+
+class ListQueue:
+    """The previous QueueManager's skip and info logic"""
+    
+    def __init__(self):
+        self.queue = []
+        self.current_index = 0
+    
+    def add_song(self, song_info):
+        self.queue.append(song_info)
+    
+    def skip_song(self):
+        skipped_song = self.queue[self.current_index]
+        self.current_index += 1
+        self.queue = self.queue[self.current_index:]
+        self.current_index = 0
+        return skipped_song
+    
+    def get_queue_info(self):
+        current_queue = self.queue[self.current_index:]
+        return {
+            'total_songs': len(current_queue),
+            'queue_duration': sum(song.duration for song in current_queue)
+        }
+
+def make_songs(count: int):
+    return [Song(f"video{i:05d}", f"Song {i}", 180 + i % 120) for i in range(count)]
+
+def bench(queue, songs) -> float:
+    """Fill a queue, then skip through it checking the info after each skip"""
+    start = time.perf_counter()
+    for song in songs:
+        queue.add_song(song)
+    for _ in songs:
+        queue.get_queue_info()
+        queue.skip_song()
+    return time.perf_counter() - start
+
+def bench_remove_move(size: int, operations: int) -> float:
+    """Remove from and reorder the middle of a full queue"""
+    queue = QueueManager(max_size=size)
+    for song in make_songs(size):
+        queue.add_song(song)
+    
+    start = time.perf_counter()
+    for i in range(operations):
+        queue.move_song(1 + i % (size - 1), size // 2)
+        queue.add_song(queue.remove_song(size // 3))
+    return (time.perf_counter() - start) / operations
+
+if __name__ == '__main__':
+    for size in (50, 2000, 10000):
+        songs = make_songs(size)
+        old = bench(ListQueue(), songs)
+        new = bench(QueueManager(max_size=size), songs)
+        
+        print(f"{size} songs, add + info/skip each:")
+        print(f"  list rebuilding: {old * 1000:.2f} ms ({old / size * 1e6:.2f} µs per skip)")
+        print(f"  head index:      {new * 1000:.2f} ms ({new / size * 1e6:.2f} µs per skip)")
+    
+    per_op = bench_remove_move(2000, 10000)
+    print(f"move + remove/add in a 2000 song queue: {per_op * 1e6:.2f} µs")
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Benchmark restoring a persisted queue after a restart
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from bot.queue_manager import QueueManager
+from bot.queue_store import QueueStore
+from bot.song import Song
+
+async def store_queue(db_path: str, size: int):
+    """Persist one chat queue of the given size"""
+    store = QueueStore(db_path)
+    queue = QueueManager(-100, on_change=store.mark_dirty, max_size=size)
+    for i in range(size):
+        queue.add_song(Song(f"radio{i:06d}", f"Radio song {i}", 200))
+    await store.close()
+
+def bench_restore(db_path: str, iterations: int) -> float:
+    """Load and restore the queue from a fresh store each time"""
+    elapsed = 0.0
+    for _ in range(iterations):
+        store = QueueStore(db_path)
+        start = time.perf_counter()
+        QueueManager(-100, max_size=10000).restore(store.load(-100))
+        elapsed += time.perf_counter() - start
+        asyncio.run(store.close())
+    return elapsed / iterations
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (50, 2000):
+            db_path = os.path.join(directory, f'queue{size}.db')
+            asyncio.run(store_queue(db_path, size))
+            per_restore = bench_restore(db_path, 20)
+            print(f"Restore of a {size} song queue: {per_restore * 1000:.2f} ms")
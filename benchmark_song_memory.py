@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Measure memory per queued song: per-song info dicts against shared Songs
+"""
+
+import json
+import random
+import tracemalloc
+from bot.song import Song
+
+CHATS = 2000
+SONGS_PER_QUEUE = 20
+DISTINCT_VIDEOS = 5000
+
+def extracted_info(rng: random.Random, n: int) -> dict:
+    """A video info dict as _info_to_dict builds it, decoded from fresh
+    JSON the way every extraction produces new string objects"""
+    video_id = f"{n:011d}"
+    info = {
+        'id': video_id,
+        'title': f"Artist {n % 700} - Track number {n} (Official Music Video)",
+        'duration': rng.randint(120, 600),
+        'uploader': f"Artist {n % 700} Official",
+        'view_count': rng.randint(1000, 10 ** 9),
+        'url': f"https://www.youtube.com/watch?v={video_id}",
+        'thumbnail': f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg"
+    }
+    return json.loads(json.dumps(info))
+
+def measure(build) -> float:
+    """Bytes allocated per queued song by build()"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    queues = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    del queues
+    return (after - before) / (CHATS * SONGS_PER_QUEUE)
+
+def picks():
+    """The videos each chat queues; popular videos recur across chats"""
+    rng = random.Random(1)
+    return [
+        [int(rng.paretovariate(1.2) * 10) % DISTINCT_VIDEOS for _ in range(SONGS_PER_QUEUE)]
+        for _ in range(CHATS)
+    ]
+
+def build_dicts():
+    rng = random.Random(2)
+    return [[extracted_info(rng, n) for n in queue] for queue in picks()]
+
+def build_songs():
+    rng = random.Random(2)
+    return [[Song.from_info(extracted_info(rng, n)) for n in queue] for queue in picks()]
+
+def build_unshared_songs():
+    """Separate Song per entry, sharing only interned strings"""
+    rng = random.Random(2)
+    return [
+        [Song(**{key: info[key] for key in ('id', 'title', 'duration', 'uploader')})
+         for info in (extracted_info(rng, n) for n in queue)]
+        for queue in picks()
+    ]
+
+if __name__ == '__main__':
+    distinct = len({n for queue in picks() for n in queue})
+    dict_bytes = measure(build_dicts)
+    unshared_bytes = measure(build_unshared_songs)
+    song_bytes = measure(build_songs)
+    
+    print(f"{CHATS} chats x {SONGS_PER_QUEUE} songs, {distinct} distinct videos")
+    print(f"Info dict per queued song: {dict_bytes:.0f} bytes")
+    print(f"Song per queued song, interned strings only: {unshared_bytes:.0f} bytes")
+    print(f"Shared Song per queued song: {song_bytes:.0f} bytes")
+    print(f"Saved: {(1 - song_bytes / dict_bytes) * 100:.0f}%")
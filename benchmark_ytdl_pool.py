@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark YoutubeDL construction against pooled checkout
+"""
+
+import time
+import yt_dlp
+from bot.ytdl_pool import YoutubeDLPool
+
+OPTIONS = {
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': False
+}
+
+def bench_fresh(iterations: int) -> float:
+    """Build and close a YoutubeDL per call, like the old code did"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with yt_dlp.YoutubeDL(dict(OPTIONS)) as ytdl:
+            pass
+    return (time.perf_counter() - start) / iterations
+
+def bench_pooled(iterations: int) -> float:
+    """Check an instance out of a warm pool per call"""
+    pool = YoutubeDLPool({'info': OPTIONS}, max_idle=1)
+    pool.warm()
+    
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with pool.checkout('info') as ytdl:
+            pass
+    elapsed = (time.perf_counter() - start) / iterations
+    
+    pool.close()
+    return elapsed
+
+if __name__ == '__main__':
+    iterations = 200
+    
+    fresh = bench_fresh(iterations)
+    pooled = bench_pooled(iterations)
+    
+    print(f"Fresh YoutubeDL per call: {fresh * 1000:.3f} ms")
+    print(f"Pooled checkout per call: {pooled * 1000:.3f} ms")
+    print(f"Saved per call: {(fresh - pooled) * 1000:.3f} ms")
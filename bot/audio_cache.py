@@ -0,0 +1,214 @@
+"""
+Audio Cache
+Content-addressed on-disk cache of downloaded audio files
+"""
+
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class _CacheEntry:
+    """A cached audio file"""
+    
+    __slots__ = ('path', 'size', 'readers')
+    
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.readers = 0
+
+class AudioCache:
+    """Audio files keyed by video ID and format, bounded by a byte budget
+    
+    Files are named ``{video_id}.{fmt}.{ext}`` so the index can be rebuilt
+    from the directory on startup. Callers pin a file with acquire() or
+    add() and unpin it with release(); pinned files are never evicted, so
+    a file can't disappear while it is being uploaded.
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """Initialize audio cache
+        
+        Args:
+            cache_dir: Directory holding the cached files
+            max_bytes: Total size the cache is evicted down to
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        
+        self._lock = threading.Lock()
+        
+        # key -> entry, least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        self._keys_by_path: Dict[str, str] = {}
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+    
+    @staticmethod
+    def make_key(video_id: str, fmt: str) -> str:
+        """Build the cache key for a video and format"""
+        return f"{video_id}.{fmt}"
+    
+    def _load_index(self):
+        """Index files left over from a previous run, oldest first"""
+        files = []
+        
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            parts = name.split('.')
+            
+            # Partial downloads and foreign files aren't cache entries
+            if len(parts) != 3 or name.endswith('.part') or not os.path.isfile(path):
+                continue
+            
+            stat = os.stat(path)
+            files.append((stat.st_atime, '.'.join(parts[:2]), path, stat.st_size))
+        
+        for _, key, path, size in sorted(files):
+            self._entries[key] = _CacheEntry(path, size)
+            self._keys_by_path[path] = key
+            self.total_bytes += size
+        
+        logger.info(
+            f"Audio cache loaded: {len(self._entries)} files, {self.total_bytes} bytes"
+        )
+    
+    def acquire(self, video_id: str, fmt: str) -> Optional[str]:
+        """Look up and pin a cached file
+        
+        Returns:
+            Path of the cached file, or None on a miss
+        """
+        key = self.make_key(video_id, fmt)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            
+            # The file may have been removed behind our back
+            if entry is not None and not os.path.exists(entry.path):
+                self._forget(key)
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            entry.readers += 1
+            self.hits += 1
+            return entry.path
+    
+    def add(self, video_id: str, fmt: str, source_path: str, readers: int = 1) -> str:
+        """Move a downloaded file into the cache and pin it
+        
+        Args:
+            video_id: YouTube video ID
+            fmt: Format key the file was downloaded with
+            source_path: Downloaded file, moved into the cache
+            readers: Number of pins to take, one per caller that will
+                release() it
+        
+        Returns:
+            Path of the file inside the cache
+        """
+        key = self.make_key(video_id, fmt)
+        ext = os.path.splitext(source_path)[1]
+        path = os.path.join(self.cache_dir, f"{key}{ext}")
+        
+        # The download may sit on another filesystem, where a rename fails;
+        # stage it next to its final name first so the swap is atomic
+        staging_path = f"{path}.part"
+        shutil.move(source_path, staging_path)
+        
+        with self._lock:
+            if key in self._entries:
+                self._forget(key)
+            
+            os.replace(staging_path, path)
+            
+            entry = _CacheEntry(path, os.path.getsize(path))
+            entry.readers = readers
+            self._entries[key] = entry
+            self._keys_by_path[path] = key
+            self.total_bytes += entry.size
+            
+            self._evict()
+        
+        return path
+    
+    def release(self, path: str):
+        """Unpin a file returned by acquire() or add()"""
+        with self._lock:
+            key = self._keys_by_path.get(path)
+            entry = self._entries.get(key) if key else None
+            
+            if entry is not None and entry.readers > 0:
+                entry.readers -= 1
+            
+            self._evict()
+    
+    def path_for(self, video_id: str, fmt: str) -> Optional[str]:
+        """Get the path of a cached file without pinning it"""
+        with self._lock:
+            entry = self._entries.get(self.make_key(video_id, fmt))
+            return entry.path if entry else None
+    
+    def contains(self, video_id: str, fmt: str) -> bool:
+        """Check for a cached file without touching counters or LRU order"""
+        with self._lock:
+            return self.make_key(video_id, fmt) in self._entries
+    
+    def _evict(self):
+        """Remove least recently used unpinned files until under budget"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        
+        for key in list(self._entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            
+            entry = self._entries[key]
+            if entry.readers:
+                continue
+            
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Error evicting cached audio {entry.path}: {e}")
+                continue
+            
+            self._forget(key)
+            self.evictions += 1
+    
+    def _forget(self, key: str):
+        entry = self._entries.pop(key)
+        self._keys_by_path.pop(entry.path, None)
+        self.total_bytes -= entry.size
+    
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            
+            return {
+                'files': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
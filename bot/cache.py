@@ -0,0 +1,175 @@
+"""
+Cache helpers
+In-process TTL/LRU cache and single-flight request coalescing
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+def approx_size(value: Any) -> int:
+    """Rough deep size of plain data (dicts, lists, strings, numbers)"""
+    size = sys.getsizeof(value)
+    
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += approx_size(key) + approx_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += approx_size(item)
+    
+    return size
+
+class TTLCache:
+    """LRU cache with per-entry expiry and an optional byte budget"""
+    
+    def __init__(self, max_entries: int, ttl: float,
+                 max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = approx_size):
+        """Initialize cache
+        
+        Args:
+            max_entries: Maximum number of entries kept
+            ttl: Seconds an entry stays valid after being stored
+            max_bytes: Approximate memory budget for all values
+            sizeof: Function estimating the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        
+        # key -> (expires_at, size, value), oldest first
+        self._entries: OrderedDict = OrderedDict()
+        self.total_bytes = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, counting the lookup as a hit or a miss"""
+        entry = self._entries.get(key)
+        
+        if entry is None:
+            self.misses += 1
+            return default
+        
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting least recently used entries if needed"""
+        if key in self._entries:
+            self._remove(key)
+        
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self.total_bytes += size
+        
+        while (len(self._entries) > self.max_entries or
+               (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        
+        self._remove(key)
+        return entry[2]
+    
+    def clear(self):
+        """Remove all entries"""
+        self._entries.clear()
+        self.total_bytes = 0
+    
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+    
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        lookups = self.hits + self.misses
+        
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions
+        }
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution"""
+    
+    def __init__(self):
+        """Initialize single-flight group"""
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.coalesced = 0
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func once for all concurrent callers using the same key
+        
+        The work runs in its own task, so one caller being cancelled does
+        not cancel the result the other callers are waiting for. Once
+        every caller has been cancelled, the work is cancelled too.
+        """
+        task = self._inflight.get(key)
+        
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._inflight.get(key) is task and self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+    
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        
+        # Mark the exception as retrieved if every caller went away
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight call for {key!r} failed: {task.exception()}")
@@ -0,0 +1,187 @@
+"""
+Chat Actor
+Runs each chat's updates one at a time while chats proceed in parallel
+"""
+
+import asyncio
+import logging
+import sys
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+class MailboxFull(Exception):
+    """Raised when a key already has max_mailbox items waiting"""
+
+class ChatActors:
+    """A mailbox and a single consumer task per key
+    
+    Work for one key runs strictly in submission order; work for different
+    keys runs concurrently. A consumer exits once its mailbox is empty, so
+    only chats with pending work cost a task.
+    
+    Work only takes a slot of the shared semaphore once it starts running,
+    so a chat with a long backlog holds one slot, not one per waiting item.
+    """
+    
+    def __init__(self, max_mailbox: Optional[int] = None,
+                 semaphore: Optional[asyncio.Semaphore] = None):
+        """Initialize actors
+        
+        Args:
+            max_mailbox: Most items waiting per key; more are refused
+            semaphore: Held while an item runs, shared by all keys
+        """
+        self.max_mailbox = max_mailbox
+        self.semaphore = semaphore
+        
+        # key -> deque of (coroutine, future)
+        self._mailboxes: Dict[Hashable, deque] = {}
+        self._consumers: Dict[Hashable, asyncio.Task] = {}
+        
+        self.processed = 0
+        self.dropped = 0
+        self.peak_mailbox = 0
+    
+    async def submit(self, key: Hashable, coroutine: Awaitable[Any]) -> Any:
+        """Run a coroutine in the key's actor and wait for its result
+        
+        Raises:
+            MailboxFull: The key's mailbox is full; the coroutine was
+                closed without running
+        """
+        mailbox = self._mailboxes.get(key)
+        if mailbox is not None and self.max_mailbox is not None and len(mailbox) >= self.max_mailbox:
+            coroutine.close()
+            self.dropped += 1
+            raise MailboxFull(f"{len(mailbox)} items already waiting for {key}")
+        
+        future = asyncio.get_running_loop().create_future()
+        
+        if mailbox is None:
+            mailbox = self._mailboxes[key] = deque()
+            self._consumers[key] = asyncio.ensure_future(self._consume(key, mailbox))
+        
+        mailbox.append((coroutine, future))
+        self.peak_mailbox = max(self.peak_mailbox, len(mailbox))
+        return await future
+    
+    async def _consume(self, key: Hashable, mailbox: deque):
+        try:
+            while mailbox:
+                coroutine, future = mailbox.popleft()
+                if future.done():
+                    # The submitter was cancelled while waiting
+                    coroutine.close()
+                    continue
+                
+                try:
+                    result = await self._run(coroutine)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                self.processed += 1
+        finally:
+            # Shutting down: nobody else will run what is left
+            for coroutine, future in mailbox:
+                coroutine.close()
+                future.cancel()
+            del self._mailboxes[key]
+            del self._consumers[key]
+    
+    async def _run(self, coroutine: Awaitable[Any]) -> Any:
+        if self.semaphore is None:
+            return await coroutine
+        
+        async with self.semaphore:
+            return await coroutine
+    
+    async def shutdown(self):
+        """Cancel all consumers and pending work"""
+        consumers = list(self._consumers.values())
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+    
+    def stats(self) -> Dict:
+        """Get actor counters"""
+        return {
+            'active_chats': len(self._consumers),
+            'queued': sum(len(mailbox) for mailbox in self._mailboxes.values()),
+            'peak_mailbox': self.peak_mailbox,
+            'processed': self.processed,
+            'dropped': self.dropped
+        }
+
+class ChatUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates concurrently across chats and in order within one
+    
+    Handlers therefore never interleave with another handler of the same
+    chat, so queue reads and writes need no locks. Handlers should hand
+    long work such as downloads to a background task to keep their chat
+    responsive.
+    
+    An update only counts against max_concurrent_updates while it runs,
+    so a flooding chat can't hold the slots of every other chat with its
+    backlog. The base class semaphore, taken while an update waits, is
+    therefore left unbounded, and the actors hold a semaphore of their own.
+    Updates are admitted before they are queued, and each chat keeps at
+    most max_pending_updates waiting.
+    """
+    
+    def __init__(self, max_concurrent_updates: int, max_pending_updates: int,
+                 admit: Optional[Callable[[object], Awaitable[bool]]] = None,
+                 on_overflow: Optional[Callable[[object], Awaitable[None]]] = None):
+        """Initialize update processor
+        
+        Args:
+            max_concurrent_updates: Updates running at once across all chats
+            max_pending_updates: Updates waiting per chat behind the
+                running one
+            admit: Called with each update before it is queued; updates
+                it returns False for are not processed
+            on_overflow: Called with an update turned away because its
+                chat already has max_pending_updates waiting
+        """
+        super().__init__(sys.maxsize)
+        self.admit = admit
+        self.on_overflow = on_overflow
+        self.actors = ChatActors(
+            max_mailbox=max_pending_updates,
+            semaphore=asyncio.BoundedSemaphore(max_concurrent_updates)
+        )
+    
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """Admit an update and route it to its chat's actor"""
+        if self.admit and not await self.admit(update):
+            coroutine.close()
+            return
+        
+        chat = update.effective_chat if isinstance(update, Update) else None
+        if chat is None:
+            async with self.actors.semaphore:
+                await coroutine
+            return
+        
+        try:
+            await self.actors.submit(chat.id, coroutine)
+        except MailboxFull as e:
+            logger.warning(f"Turned away update: {e}")
+            if self.on_overflow:
+                await self.on_overflow(update)
+    
+    async def initialize(self) -> None:
+        """Nothing to set up; actors start with their chat's first update"""
+    
+    async def shutdown(self) -> None:
+        """Stop all chat actors"""
+        await self.actors.shutdown()
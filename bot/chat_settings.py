@@ -0,0 +1,90 @@
+"""
+Chat Settings
+Per-chat preferences such as the audio quality tier, kept across restarts
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+from bot.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT = ''  # Cached marker for chats without a stored setting
+
+class ChatSettings(SQLiteStore):
+    """Maps a chat ID to its quality tier, kept in SQLite
+    
+    Only chats that chose a non-default tier have a row. Lookups go
+    through a bounded in-memory cache that also remembers chats without
+    a row, so the default path doesn't hit SQLite on every queue change.
+    """
+    
+    def __init__(self, db_path: str, memory_size: int = 5000):
+        """Initialize chat settings
+        
+        Args:
+            db_path: SQLite database file
+            memory_size: Number of chats kept in memory in front of SQLite
+        """
+        super().__init__(
+            db_path,
+            'CREATE TABLE IF NOT EXISTS chat_settings ('
+            'chat_id INTEGER PRIMARY KEY, '
+            'quality TEXT NOT NULL, '
+            'updated_at REAL NOT NULL)',
+            memory_size=memory_size
+        )
+        
+        self.loads = 0
+    
+    def get_quality(self, chat_id: Any) -> Optional[str]:
+        """Get the quality tier a chat chose, None if it uses the default"""
+        with self._lock:
+            quality = self._memory.get(chat_id)
+            
+            if quality is None:
+                try:
+                    row = self._conn.execute(
+                        'SELECT quality FROM chat_settings WHERE chat_id = ?',
+                        (chat_id,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.error(f"Error loading settings of chat {chat_id}: {e}")
+                    return None
+                
+                quality = row[0] if row else _DEFAULT
+                self._memory.set(chat_id, quality)
+                self.loads += 1
+        
+        return quality or None
+    
+    def set_quality(self, chat_id: Any, quality: Optional[str]):
+        """Store the quality tier of a chat
+        
+        Args:
+            chat_id: Chat the setting belongs to
+            quality: Tier name, or None to go back to the default
+        """
+        try:
+            with self._lock:
+                if quality:
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO chat_settings (chat_id, quality, updated_at) '
+                        'VALUES (?, ?, ?)',
+                        (chat_id, quality, time.time())
+                    )
+                else:
+                    self._conn.execute('DELETE FROM chat_settings WHERE chat_id = ?', (chat_id,))
+                self._conn.commit()
+                self._memory.set(chat_id, quality or _DEFAULT)
+        except sqlite3.Error as e:
+            logger.error(f"Error storing settings of chat {chat_id}: {e}")
+    
+    def stats(self) -> Dict:
+        """Get settings counters"""
+        return {
+            'cached_chats': len(self._memory),
+            'loads': self.loads
+        }
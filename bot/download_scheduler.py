@@ -0,0 +1,256 @@
+"""
+Download Scheduler
+Runs downloads on a bounded number of workers with priorities and
+per-chat fairness
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lower value runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PREFETCH = 1
+
+PositionCallback = Callable[[int], Awaitable[None]]
+
+class _DownloadJob:
+    """A queued download"""
+    
+    __slots__ = ('key', 'chat_id', 'priority', 'func', 'future', 'on_position', 'position')
+    
+    def __init__(self, key: Hashable, chat_id: Any, priority: int,
+                 func: Callable[[], Awaitable[Any]],
+                 future: asyncio.Future,
+                 on_position: Optional[PositionCallback]):
+        self.key = key
+        self.chat_id = chat_id
+        self.priority = priority
+        self.func = func
+        self.future = future
+        self.on_position = on_position
+        self.position = 0
+
+class DownloadScheduler:
+    """Bounded worker pool for downloads
+    
+    Jobs are taken by priority first. Within a priority, chats are served
+    round-robin, so one chat queueing many downloads can't hold every
+    worker while other chats wait.
+    """
+    
+    def __init__(self, max_workers: int):
+        """Initialize download scheduler
+        
+        Args:
+            max_workers: Number of downloads running at the same time
+        """
+        self.max_workers = max_workers
+        
+        # priority -> chat_id -> pending jobs; chats rotate to the end
+        # after each job so they are served in turn
+        self._pending: Dict[int, OrderedDict] = {}
+        # key -> waiting job, for jobs submitted with a key
+        self._keyed: Dict[Hashable, _DownloadJob] = {}
+        self._condition = asyncio.Condition()
+        self._workers: List[asyncio.Task] = []
+        
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+    
+    async def submit(self, func: Callable[[], Awaitable[Any]], chat_id: Any = None,
+                     priority: int = PRIORITY_INTERACTIVE,
+                     on_position: Optional[PositionCallback] = None,
+                     key: Optional[Hashable] = None) -> Any:
+        """Queue a download and wait for its result
+        
+        Args:
+            func: Coroutine function doing the download
+            chat_id: Chat the download is for, used for fairness
+            priority: PRIORITY_INTERACTIVE or PRIORITY_PREFETCH
+            on_position: Called with the 1-based queue position while
+                the job is waiting for a worker
+            key: Identifies the job for promote() while it is waiting
+        
+        Returns:
+            Whatever func returns
+        """
+        self._ensure_workers()
+        
+        job = _DownloadJob(
+            key, chat_id, priority, func,
+            asyncio.get_running_loop().create_future(), on_position
+        )
+        
+        async with self._condition:
+            chats = self._pending.setdefault(priority, OrderedDict())
+            chats.setdefault(chat_id, deque()).append(job)
+            if key is not None:
+                self._keyed[key] = job
+            self._condition.notify()
+        
+        self._report_positions()
+        
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            self._discard(job)
+            raise
+    
+    def promote(self, key: Hashable, priority: int,
+                on_position: Optional[PositionCallback] = None) -> bool:
+        """Raise the priority of a waiting job
+        
+        Used when an interactive caller joins a download that was queued
+        as a prefetch, so the caller doesn't wait behind other chats'
+        interactive downloads.
+        
+        Args:
+            key: Key the job was submitted with
+            priority: New priority, only applied if it runs sooner
+            on_position: Queue position callback, if the job has none
+        
+        Returns:
+            True if a waiting job was found
+        """
+        job = self._keyed.get(key)
+        if job is None:
+            return False
+        
+        if job.on_position is None:
+            job.on_position = on_position
+        
+        if priority < job.priority:
+            self._unqueue(job)
+            job.priority = priority
+            chats = self._pending.setdefault(priority, OrderedDict())
+            chats.setdefault(job.chat_id, deque()).append(job)
+            self._keyed[key] = job
+        
+        self._report_positions()
+        return True
+    
+    def queued(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return sum(
+            len(jobs) for chats in self._pending.values() for jobs in chats.values()
+        )
+    
+    def stats(self) -> Dict:
+        """Get scheduler counters"""
+        return {
+            'workers': self.max_workers,
+            'active': self.active,
+            'queued': self.queued(),
+            'completed': self.completed,
+            'failed': self.failed
+        }
+    
+    def _ensure_workers(self):
+        """Start workers on the running loop the first time they're needed"""
+        self._workers = [task for task in self._workers if not task.done()]
+        
+        while len(self._workers) < self.max_workers:
+            self._workers.append(asyncio.ensure_future(self._worker()))
+    
+    async def _worker(self):
+        while True:
+            async with self._condition:
+                job = self._next_job()
+                while job is None:
+                    await self._condition.wait()
+                    job = self._next_job()
+            
+            self._report_positions()
+            
+            if job.future.done():
+                continue  # Caller went away while it was queued
+            
+            self.active += 1
+            try:
+                result = await job.func()
+                if not job.future.done():
+                    job.future.set_result(result)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self.active -= 1
+    
+    def _next_job(self) -> Optional[_DownloadJob]:
+        """Pop the next job in dispatch order"""
+        for priority in sorted(self._pending):
+            chats = self._pending[priority]
+            
+            if not chats:
+                continue
+            
+            chat_id, jobs = next(iter(chats.items()))
+            job = jobs.popleft()
+            self._forget_key(job)
+            
+            # Rotate the chat behind the others, or drop it when empty
+            if jobs:
+                chats.move_to_end(chat_id)
+            else:
+                del chats[chat_id]
+            
+            return job
+        
+        return None
+    
+    def _dispatch_order(self) -> List[_DownloadJob]:
+        """Waiting jobs in the order workers will take them"""
+        order = []
+        
+        for priority in sorted(self._pending):
+            rounds = [list(jobs) for jobs in self._pending[priority].values()]
+            depth = max((len(jobs) for jobs in rounds), default=0)
+            
+            for index in range(depth):
+                order.extend(jobs[index] for jobs in rounds if index < len(jobs))
+        
+        return order
+    
+    def _report_positions(self):
+        """Tell waiting callers about queue position changes"""
+        for position, job in enumerate(self._dispatch_order(), start=1):
+            if job.on_position is None or job.position == position:
+                continue
+            
+            job.position = position
+            task = asyncio.ensure_future(job.on_position(position))
+            task.add_done_callback(_log_callback_error)
+    
+    def _discard(self, job: _DownloadJob):
+        """Drop a cancelled job that hasn't started yet"""
+        if self._unqueue(job):
+            self._report_positions()
+    
+    def _unqueue(self, job: _DownloadJob) -> bool:
+        """Take a job out of the pending jobs, True if it was waiting"""
+        chats = self._pending.get(job.priority, {})
+        jobs = chats.get(job.chat_id)
+        
+        if not jobs or job not in jobs:
+            return False
+        
+        jobs.remove(job)
+        if not jobs:
+            del chats[job.chat_id]
+        self._forget_key(job)
+        return True
+    
+    def _forget_key(self, job: _DownloadJob):
+        if job.key is not None and self._keyed.get(job.key) is job:
+            del self._keyed[job.key]
+
+def _log_callback_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error in download position callback: {task.exception()}")
@@ -0,0 +1,161 @@
+"""
+Executors
+Named, separately sized worker pools for blocking yt-dlp work
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class InstrumentedExecutor:
+    """Executor wrapper that tracks load and queueing delay"""
+    
+    def __init__(self, name: str, executor: Executor, max_workers: int):
+        """Initialize executor wrapper
+        
+        Args:
+            name: Name used in stats and logs
+            executor: Underlying thread or process pool
+            max_workers: Size of the underlying pool
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = executor
+        self._in_process = isinstance(executor, ProcessPoolExecutor)
+        self._lock = threading.Lock()
+        
+        self.pending = 0
+        self.active = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def submit(self, func: Callable, *args: Any) -> Future:
+        """Submit work from synchronous code"""
+        submitted_at = time.monotonic()
+        
+        with self._lock:
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        
+        if self._in_process:
+            # Work in another process can't report when it starts, so it
+            # counts as pending until it is done
+            future = self._executor.submit(func, *args)
+            future.add_done_callback(lambda _: self._leave_pending())
+        else:
+            future = self._executor.submit(self._run_tracked, submitted_at, func, *args)
+            future.add_done_callback(self._on_thread_done)
+        
+        return future
+    
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run func in the pool and await its result"""
+        return await asyncio.wrap_future(self.submit(func, *args))
+    
+    def _run_tracked(self, submitted_at: float, func: Callable, *args: Any) -> Any:
+        wait = time.monotonic() - submitted_at
+        
+        with self._lock:
+            self.pending -= 1
+            self.active += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+    
+    def _on_thread_done(self, future: Future):
+        # Work cancelled before a worker picked it up never ran _run_tracked
+        if future.cancelled():
+            self._leave_pending()
+    
+    def _leave_pending(self):
+        with self._lock:
+            self.pending -= 1
+    
+    def stats(self) -> Dict:
+        """Get load counters"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'max_workers': self.max_workers,
+                'active': self.active,
+                'pending': self.pending,
+                'peak_pending': self.peak_pending,
+                'saturation': self.active / self.max_workers,
+                'submitted': self.submitted,
+                'avg_wait': self.total_wait / self.submitted if self.submitted else 0.0,
+                'max_wait': self.max_wait
+            }
+    
+    def shutdown(self, wait: bool = False):
+        """Shut the underlying pool down"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+class Executors:
+    """The worker pools used by YouTubeService
+    
+    Searches, metadata lookups and downloads each get their own pool so
+    multi-minute downloads can't hold the threads a one-second search
+    needs. With Config.EXTRACT_IN_PROCESS set, the CPU-heavy part of full
+    metadata extraction also runs in a process pool.
+    """
+    
+    def __init__(self):
+        """Create pools sized from Config"""
+        self.search = self._thread_pool('search', Config.SEARCH_WORKERS)
+        self.metadata = self._thread_pool('metadata', Config.METADATA_WORKERS)
+        self.download = self._thread_pool('download', Config.DOWNLOAD_WORKERS)
+        
+        self.extract: Optional[InstrumentedExecutor] = None
+        if Config.EXTRACT_IN_PROCESS:
+            # Spawned workers don't inherit the bot's threads or locks
+            self.extract = InstrumentedExecutor(
+                'extract',
+                ProcessPoolExecutor(
+                    max_workers=Config.EXTRACT_PROCESSES,
+                    mp_context=multiprocessing.get_context('spawn')
+                ),
+                Config.EXTRACT_PROCESSES
+            )
+    
+    @staticmethod
+    def _thread_pool(name: str, max_workers: int) -> InstrumentedExecutor:
+        return InstrumentedExecutor(
+            name,
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'yt-{name}'),
+            max_workers
+        )
+    
+    def all(self) -> Dict[str, InstrumentedExecutor]:
+        """Pools by name"""
+        pools = {
+            'search': self.search,
+            'metadata': self.metadata,
+            'download': self.download
+        }
+        if self.extract:
+            pools['extract'] = self.extract
+        return pools
+    
+    def stats(self) -> Dict[str, Dict]:
+        """Get load counters for every pool"""
+        return {name: pool.stats() for name, pool in self.all().items()}
+    
+    def shutdown(self):
+        """Shut every pool down without waiting for running work"""
+        for pool in self.all().values():
+            pool.shutdown()
@@ -0,0 +1,113 @@
+"""
+File ID Cache
+Remembers Telegram file IDs of uploaded audio so tracks can be re-sent
+without downloading or uploading them again
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Dict, Optional
+from bot.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+class FileIdCache(SQLiteStore):
+    """Maps video ID and format to a Telegram file ID, kept across restarts"""
+    
+    def __init__(self, db_path: str, memory_size: int = 5000):
+        """Initialize file ID cache
+        
+        Args:
+            db_path: SQLite database file
+            memory_size: Number of entries kept in memory in front of SQLite
+        """
+        # Telegram file IDs don't expire on a schedule; stale ones are
+        # dropped through invalidate() when Telegram rejects them
+        super().__init__(
+            db_path,
+            'CREATE TABLE IF NOT EXISTS telegram_files ('
+            'video_id TEXT NOT NULL, '
+            'format TEXT NOT NULL, '
+            'file_id TEXT NOT NULL, '
+            'file_size INTEGER, '
+            'duration INTEGER, '
+            'updated_at REAL NOT NULL, '
+            'PRIMARY KEY (video_id, format))',
+            memory_size=memory_size
+        )
+        
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def get(self, video_id: str, fmt: str) -> Optional[Dict]:
+        """Get the stored upload for a video
+        
+        Returns:
+            Dict with file_id, file_size and duration, or None
+        """
+        key = (video_id, fmt)
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            
+            if entry is None:
+                row = self._conn.execute(
+                    'SELECT file_id, file_size, duration FROM telegram_files '
+                    'WHERE video_id = ? AND format = ?',
+                    (video_id, fmt)
+                ).fetchone()
+                
+                if row is None:
+                    self.misses += 1
+                    return None
+                
+                entry = {'file_id': row[0], 'file_size': row[1], 'duration': row[2]}
+                self._memory.set(key, entry)
+            
+            self.hits += 1
+            return dict(entry)
+    
+    def put(self, video_id: str, fmt: str, file_id: str,
+            file_size: Optional[int] = None, duration: Optional[int] = None):
+        """Record the file ID Telegram returned for an upload"""
+        entry = {'file_id': file_id, 'file_size': file_size, 'duration': duration}
+        
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO telegram_files '
+                    '(video_id, format, file_id, file_size, duration, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (video_id, fmt, file_id, file_size, duration, time.time())
+                )
+                self._conn.commit()
+                self._memory.set((video_id, fmt), entry)
+        except sqlite3.Error as e:
+            logger.error(f"Error storing file ID for {video_id}: {e}")
+    
+    def invalidate(self, video_id: str, fmt: str):
+        """Forget a file ID that Telegram rejected"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'DELETE FROM telegram_files WHERE video_id = ? AND format = ?',
+                    (video_id, fmt)
+                )
+                self._conn.commit()
+                self._memory.pop((video_id, fmt))
+                self.invalidations += 1
+        except sqlite3.Error as e:
+            logger.error(f"Error invalidating file ID for {video_id}: {e}")
+    
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        lookups = self.hits + self.misses
+        
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'invalidations': self.invalidations
+        }
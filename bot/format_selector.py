@@ -0,0 +1,88 @@
+"""
+Format Selector
+Picks the smallest audio format that still meets a chat's quality tier
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Minimum audio bitrate in kbps for each quality tier
+QUALITY_TIERS = {
+    'low': 48,
+    'standard': 96,
+    'high': 128
+}
+DEFAULT_QUALITY = 'standard'
+
+# Containers Telegram plays inline when sent with sendAudio
+PLAYABLE_EXTS = ('m4a', 'mp3')
+
+def is_audio_only(fmt: Dict) -> bool:
+    """Check whether a yt-dlp format carries audio and no video"""
+    return fmt.get('acodec') not in (None, 'none') and fmt.get('vcodec') == 'none'
+
+def estimate_size(fmt: Dict, duration: Optional[float]) -> Optional[int]:
+    """Estimate a format's size in bytes
+    
+    Uses the exact filesize when yt-dlp knows it, then its approximation,
+    then bitrate times duration.
+    """
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return int(size)
+    
+    bitrate = fmt.get('abr') or fmt.get('tbr')
+    if bitrate and duration:
+        return int(bitrate * 1000 / 8 * duration)
+    
+    return None
+
+def baseline_format(formats: List[Dict]) -> Optional[Dict]:
+    """The format 'bestaudio[ext=m4a]' would pick, for comparison"""
+    candidates = [
+        fmt for fmt in formats
+        if is_audio_only(fmt) and fmt.get('ext') == 'm4a'
+    ]
+    return max(candidates, key=lambda fmt: fmt.get('abr') or 0, default=None)
+
+def select_audio_format(formats: List[Dict], duration: Optional[float],
+                        quality: str = DEFAULT_QUALITY,
+                        max_bytes: Optional[int] = None) -> Optional[Dict]:
+    """Pick the smallest playable audio format meeting the quality tier
+    
+    Args:
+        formats: Format dicts from yt-dlp
+        duration: Track duration in seconds, used to estimate sizes
+        quality: Key of QUALITY_TIERS
+        max_bytes: Hard size ceiling; larger formats are never picked
+    
+    Returns:
+        The chosen format, or None if nothing fits under max_bytes
+    """
+    min_bitrate = QUALITY_TIERS.get(quality, QUALITY_TIERS[DEFAULT_QUALITY])
+    
+    candidates = []
+    for fmt in formats:
+        if not is_audio_only(fmt) or fmt.get('ext') not in PLAYABLE_EXTS:
+            continue
+        
+        size = estimate_size(fmt, duration)
+        if size is None:
+            continue
+        if max_bytes is not None and size > max_bytes:
+            continue
+        
+        candidates.append((size, fmt.get('abr') or 0, fmt))
+    
+    if not candidates:
+        return None
+    
+    acceptable = [entry for entry in candidates if entry[1] >= min_bitrate]
+    if acceptable:
+        # Smallest file that is still good enough
+        return min(acceptable, key=lambda entry: entry[0])[2]
+    
+    # Nothing reaches the tier; get as close to it as the ceiling allows
+    return max(candidates, key=lambda entry: (entry[1], -entry[0]))[2]
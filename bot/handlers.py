@@ -6,25 +6,131 @@ Contains all command and callback handlers for the music bot
 import logging
 import asyncio
 import os
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
+from telegram.error import BadRequest
 from bot.youtube_service import YouTubeService
+from bot.cache import TTLCache
+from bot.chat_settings import ChatSettings
+from bot.format_selector import QUALITY_TIERS, DEFAULT_QUALITY
+from bot.file_id_cache import FileIdCache
+from bot.media_group import MAX_GROUP_SIZE, GroupTrack, send_audio_group, split_albums
+from bot.message_editor import MessageEditor
+from bot.prefetcher import Prefetcher
 from bot.queue_manager import QueueManager
-from bot.utils import format_duration, is_valid_youtube_url, sanitize_filename
+from bot.queue_store import QueueStore
+from bot.queue_registry import QueueRegistry
+from bot.song import Song
+from bot.request_limiter import RequestLimiter
+from bot.utils import format_duration, is_valid_youtube_url, is_playlist_url, sanitize_filename, rate_limit_key
 from config import Config
 
 logger = logging.getLogger(__name__)
 
 # Initialize services
 youtube_service = YouTubeService()
-queue_managers = {}  # Store queue managers per chat
+file_id_cache = FileIdCache(Config.STATE_DB_PATH)
+status_editor = MessageEditor(Config.STATUS_EDIT_INTERVAL, Config.GROUP_STATUS_EDIT_INTERVAL)
+request_limiter = RequestLimiter(Config.MAX_REQUESTS_PER_MINUTE)
+# (chat_id, message_id) of a results keyboard -> video_id -> Song
+search_results = TTLCache(Config.SEARCH_RESULTS_STORE_SIZE, Config.SEARCH_RESULTS_TTL)
+chat_settings = ChatSettings(Config.STATE_DB_PATH, Config.CHAT_SETTINGS_MEMORY_SIZE)
+
+def get_chat_quality(chat_id):
+    """Get the audio quality tier of a chat"""
+    return chat_settings.get_quality(chat_id) or DEFAULT_QUALITY
+
+prefetcher = Prefetcher(
+    youtube_service,
+    lookahead=Config.PREFETCH_LOOKAHEAD,
+    max_bytes=Config.PREFETCH_MAX_BYTES,
+    is_ready=lambda video_id, quality: file_id_cache.get(video_id, quality) is not None,
+    quality_for=get_chat_quality
+)
+queue_store = QueueStore(Config.STATE_DB_PATH, Config.QUEUE_FLUSH_INTERVAL)
+
+def on_queue_change(queue_manager):
+    """Keep upcoming songs prefetched and the queue saved whenever it changes"""
+    prefetcher.sync(queue_manager.chat_id, queue_manager.peek(prefetcher.lookahead + 1))
+    queue_store.mark_dirty(queue_manager)
+
+def new_queue_manager(chat_id):
+    """Create an empty queue manager for a chat"""
+    max_size = Config.RADIO_MAX_QUEUE_SIZE if chat_id in Config.RADIO_CHAT_IDS else None
+    return QueueManager(chat_id, on_change=on_queue_change, max_size=max_size)
+
+def on_queue_evict(chat_id):
+    """Unpin prefetched audio of a chat whose queue left memory"""
+    prefetcher.sync(chat_id, [])
+
+# Queue managers of active chats; idle ones are spilled to queue_store
+queue_managers = QueueRegistry(
+    new_queue_manager,
+    queue_store,
+    max_resident=Config.MAX_RESIDENT_QUEUES,
+    idle_timeout=Config.QUEUE_IDLE_TIMEOUT,
+    on_evict=on_queue_evict
+)
 
 def get_queue_manager(chat_id):
-    """Get or create queue manager for a chat"""
-    if chat_id not in queue_managers:
-        queue_managers[chat_id] = QueueManager()
-    return queue_managers[chat_id]
+    """Get queue manager for a chat, restoring its saved queue if needed"""
+    return queue_managers.get(chat_id)
+
+def is_request(update: Update) -> bool:
+    """Whether an update is a command or a button press"""
+    is_command = bool(update.message and update.message.text and update.message.text.startswith('/'))
+    return is_command or bool(update.callback_query)
+
+async def admit_update(update: object) -> bool:
+    """Turn away commands and button presses from users over their rate limit
+    
+    Runs before the update is queued behind its chat's earlier updates, so
+    a rejected update never takes a place in the chat's mailbox, yt-dlp or
+    the download queue.
+    
+    Returns:
+        True if the update should be processed
+    """
+    if not isinstance(update, Update) or not is_request(update):
+        return True
+    
+    user = update.effective_user
+    chat = update.effective_chat
+    if not user or not chat:
+        return True
+    
+    allowed, warn = request_limiter.check(rate_limit_key(user.id, chat.id))
+    if allowed:
+        return True
+    
+    try:
+        if warn:
+            text = f"⏳ Too many requests. The limit is {Config.MAX_REQUESTS_PER_MINUTE} per minute."
+            if update.callback_query:
+                await update.callback_query.answer(text, show_alert=True)
+            else:
+                await update.message.reply_text(text)
+        elif update.callback_query:
+            # Stop the button's loading spinner without another message
+            await update.callback_query.answer()
+    except Exception as e:
+        logger.error(f"Error answering a rate limited update: {e}")
+    return False
+
+async def reject_busy_update(update: object):
+    """Tell the user an update was turned away because their chat is busy"""
+    if not isinstance(update, Update) or not is_request(update):
+        return
+    
+    text = "⏳ Still working on earlier requests in this chat. Please try again in a moment."
+    try:
+        if update.callback_query:
+            await update.callback_query.answer(text, show_alert=True)
+        else:
+            await update.message.reply_text(text)
+    except Exception as e:
+        logger.error(f"Error answering a turned away update: {e}")
 
 async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command"""
@@ -54,24 +160,37 @@ async def search_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     searching_msg = await update.message.reply_text("🔍 Searching for music...")
     
     try:
-        # Search for videos
-        results = await youtube_service.search_videos(query, max_results=5)
+        # Flat results are enough for the keyboard and for queueing the
+        # picked entry, so a click needs no further extraction
+        results = await youtube_service.search_videos(
+            query, max_results=5, max_duration=Config.MAX_DURATION
+        )
         
         if not results:
-            await searching_msg.edit_text("❌ No results found for your search.")
+            status_editor.edit(searching_msg, "❌ No results found for your search.")
             return
         
+        songs = [Song.from_info(video) for video in results]
+        
         # Create inline keyboard with results
         keyboard = []
-        for i, video in enumerate(results):
-            duration = format_duration(video.get('duration', 0))
-            button_text = f"🎵 {video['title'][:40]}... ({duration})"
-            callback_data = f"play_{video['id']}"
+        for i, song in enumerate(songs):
+            duration = format_duration(song.duration)
+            button_text = f"🎵 {song.title[:40]}... ({duration})"
+            callback_data = f"play_{song.id}"
             keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
+        keyboard.append([InlineKeyboardButton("💾 Download all", callback_data='dlall')])
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await searching_msg.edit_text(
+        # Keep the results with the message so a click resolves from memory
+        search_results.set(
+            (searching_msg.chat_id, searching_msg.message_id),
+            {song.id: song for song in songs}
+        )
+        
+        status_editor.edit(
+            searching_msg,
             f"🎵 Search results for: *{query}*\n\nSelect a song to play:",
             reply_markup=reply_markup,
             parse_mode=ParseMode.MARKDOWN
@@ -79,7 +198,7 @@ async def search_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
     except Exception as e:
         logger.error(f"Error in search handler: {e}")
-        await searching_msg.edit_text("❌ An error occurred while searching. Please try again.")
+        status_editor.edit(searching_msg, "❌ An error occurred while searching. Please try again.")
 
 async def play_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /play command - for voice chat streaming"""
@@ -100,6 +219,11 @@ async def play_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     processing_msg = await update.message.reply_text("🔍 Finding music for voice chat...")
     
     try:
+        # Playlists are queued in one go
+        if is_playlist_url(query):
+            await queue_playlist(context, chat_id, query, processing_msg)
+            return
+        
         # Check if it's a YouTube URL or search query
         if is_valid_youtube_url(query):
             video_info = await youtube_service.get_video_info(query)
@@ -107,31 +231,33 @@ async def play_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # Search for the song
             results = await youtube_service.search_videos(query, max_results=1)
             if not results:
-                await processing_msg.edit_text("❌ No results found for your search.")
+                status_editor.edit(processing_msg, "❌ No results found for your search.")
                 return
             video_info = results[0]
+        song = Song.from_info(video_info)
         
         # Check duration limit
-        if video_info.get('duration', 0) > Config.MAX_DURATION:
-            await processing_msg.edit_text(
-                f"❌ Song is too long ({format_duration(video_info['duration'])}). "
+        if song.duration > Config.MAX_DURATION:
+            status_editor.edit(
+                processing_msg,
+                f"❌ Song is too long ({format_duration(song.duration)}). "
                 f"Maximum duration is {format_duration(Config.MAX_DURATION)}."
             )
             return
         
         # Add to queue
-        position = queue_manager.add_song(video_info)
+        position = queue_manager.add_song(song)
         
         # For voice chat, provide instructions and YouTube link
-        title = video_info['title'].replace('*', '').replace('_', '').replace('[', '').replace(']', '').replace('`', '')
+        title = song.title.replace('*', '').replace('_', '').replace('[', '').replace(']', '').replace('`', '')
         safe_query = query.replace('*', '').replace('_', '').replace('[', '').replace(']', '').replace('`', '')
         
         message_text = (
             f"🎵 *Voice Chat Ready*\n\n"
             f"Song: {title}\n"
-            f"Duration: {format_duration(video_info['duration'])}\n"
+            f"Duration: {format_duration(song.duration)}\n"
             f"Position in queue: {position + 1}\n\n"
-            f"🔗 Stream URL: https://youtube.com/watch?v={video_info['id']}\n\n"
+            f"🔗 Stream URL: {song.url}\n\n"
             f"📱 *To play in voice chat:*\n"
             f"1. Start a voice chat in this group\n"
             f"2. Use screen sharing to play the YouTube link\n"
@@ -139,11 +265,78 @@ async def play_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"💾 Want to download instead? Use /download {safe_query}"
         )
         
-        await processing_msg.edit_text(message_text, parse_mode=ParseMode.MARKDOWN)
+        status_editor.edit(processing_msg, message_text, parse_mode=ParseMode.MARKDOWN)
             
     except Exception as e:
         logger.error(f"Error in play handler: {e}")
-        await processing_msg.edit_text("❌ An error occurred while processing your request.")
+        status_editor.edit(processing_msg, "❌ An error occurred while processing your request.")
+
+async def queue_playlist(context: ContextTypes.DEFAULT_TYPE, chat_id: int, url: str, message):
+    """Queue every song of a playlist from one flat extraction"""
+    entries = await youtube_service.get_playlist_entries(url)
+    if not entries:
+        status_editor.edit(message, "❌ Couldn't read that playlist.")
+        return
+    
+    # Flat durations are enough to leave out over-long tracks up front
+    songs = [
+        Song.from_info(entry) for entry in entries
+        if entry['duration'] <= Config.MAX_DURATION
+    ]
+    too_long = len(entries) - len(songs)
+    
+    queue_manager = get_queue_manager(chat_id)
+    try:
+        position, added = queue_manager.add_songs(songs)
+    except Exception as e:
+        status_editor.edit(message, f"❌ {e}")
+        return
+    
+    text = f"📃 Added {added} songs from the playlist (from position {position + 1})\n"
+    if added < len(songs):
+        text += f"⚠️ {len(songs) - added} didn't fit, the queue holds {queue_manager.max_size} songs\n"
+    if too_long:
+        text += f"⏭️ {too_long} longer than {format_duration(Config.MAX_DURATION)} left out\n"
+    text += f"\n📝 Queue: {len(queue_manager)} songs, {format_duration(queue_manager.total_duration)}"
+    
+    # Offer the playlist as albums; the button resolves from this store
+    batch = songs[:min(added, Config.BATCH_DOWNLOAD_LIMIT)]
+    search_results.set((message.chat_id, message.message_id), {song.id: song for song in batch})
+    label = "💾 Download all" if len(batch) == added else f"💾 Download first {len(batch)}"
+    status_editor.edit(
+        message,
+        text,
+        reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton(label, callback_data='dlall')]])
+    )
+    
+    context.application.create_task(resolve_playlist(chat_id, songs[:added]))
+
+async def resolve_playlist(chat_id: int, songs: list):
+    """Fetch full metadata for queued playlist songs in the background
+    
+    Warms the metadata store so sending each song skips extraction, and
+    drops songs that turn out to be unavailable or too long.
+    """
+    semaphore = asyncio.Semaphore(Config.PLAYLIST_RESOLVE_CONCURRENCY)
+    
+    async def is_playable(song) -> bool:
+        async with semaphore:
+            try:
+                info = await youtube_service.get_video_info(song.url)
+            except Exception as e:
+                logger.error(f"Error resolving playlist song {song.id}: {e}")
+                return True  # Leave it to the download to find out
+        
+        # Live streams and premieres come back with a duration of None
+        return bool(info) and (info.get('duration') or 0) <= Config.MAX_DURATION
+    
+    playable = await asyncio.gather(*(is_playable(song) for song in songs))
+    unplayable = {song.id for song, ok in zip(songs, playable) if not ok}
+    
+    if unplayable:
+        # The chat may have been evicted and rehydrated meanwhile
+        removed = get_queue_manager(chat_id).discard_songs(unplayable)
+        logger.info(f"Dropped {removed} unplayable playlist songs from chat {chat_id}")
 
 async def download_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /download command - for MP3 file downloads"""
@@ -169,42 +362,44 @@ async def download_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # Search for the song
             results = await youtube_service.search_videos(query, max_results=1)
             if not results:
-                await processing_msg.edit_text("❌ No results found for your search.")
+                status_editor.edit(processing_msg, "❌ No results found for your search.")
                 return
             video_info = results[0]
+        song = Song.from_info(video_info)
         
         # Check duration limit
-        if video_info.get('duration', 0) > Config.MAX_DURATION:
-            await processing_msg.edit_text(
-                f"❌ Song is too long ({format_duration(video_info['duration'])}). "
+        if song.duration > Config.MAX_DURATION:
+            status_editor.edit(
+                processing_msg,
+                f"❌ Song is too long ({format_duration(song.duration)}). "
                 f"Maximum duration is {format_duration(Config.MAX_DURATION)}."
             )
             return
         
         # Download immediately without using queue
-        title = video_info['title'].replace('*', '').replace('_', '').replace('[', '').replace(']', '').replace('`', '')
+        title = song.title.replace('*', '').replace('_', '').replace('[', '').replace(']', '').replace('`', '')
         
         message_text = (
             f"💾 Now downloading: {title}\n"
-            f"Duration: {format_duration(video_info['duration'])}\n"
+            f"Duration: {format_duration(song.duration)}\n"
             f"Please wait..."
         )
         
-        await processing_msg.edit_text(message_text, parse_mode=ParseMode.MARKDOWN)
+        status_editor.edit(processing_msg, message_text, parse_mode=ParseMode.MARKDOWN)
         
         # Download and send audio file immediately - no queue involved
-        await download_and_send_audio(update, context, video_info, processing_msg)
+        start_delivery(update, context, song, processing_msg)
             
     except Exception as e:
         logger.error(f"Error in download handler: {e}")
-        await processing_msg.edit_text("❌ An error occurred while processing your request.")
+        status_editor.edit(processing_msg, "❌ An error occurred while processing your request.")
 
 async def queue_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /queue command"""
     chat_id = update.effective_chat.id
     queue_manager = get_queue_manager(chat_id)
     
-    queue_list = queue_manager.get_queue()
+    queue_list = queue_manager.peek(Config.QUEUE_DISPLAY_LIMIT)
     
     if not queue_list:
         await update.message.reply_text("📝 Queue is empty.")
@@ -213,8 +408,14 @@ async def queue_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = "📝 Current Queue:\n\n"
     for i, song in enumerate(queue_list):
         status = "🎵 Now Playing" if i == 0 else f"#{i}"
-        message += f"{status} - {song['title']}\n"
-        message += f"   Duration: {format_duration(song.get('duration', 0))}\n\n"
+        message += f"{status} - {song.title}\n"
+        message += f"   Duration: {format_duration(song.duration)}\n\n"
+    
+    # Radio queues can be far longer than one message
+    hidden = len(queue_manager) - len(queue_list)
+    if hidden > 0:
+        message += f"...and {hidden} more\n\n"
+    message += f"Total: {len(queue_manager)} songs, {format_duration(queue_manager.total_duration)}"
     
     await update.message.reply_text(message)
 
@@ -233,15 +434,15 @@ async def skip_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     if next_song:
         await update.message.reply_text(
-            f"⏭️ Skipped: {skipped_song['title']}\n"
-            f"🎵 Now playing: {next_song['title']}"
+            f"⏭️ Skipped: {skipped_song.title}\n"
+            f"🎵 Now playing: {next_song.title}"
         )
         # Here you would typically start playing the next song
         # For this implementation, we'll just send the audio file
         processing_msg = await update.message.reply_text("🎵 Preparing next song...")
-        await download_and_send_audio(update, context, next_song, processing_msg)
+        start_delivery(update, context, next_song, processing_msg)
     else:
-        await update.message.reply_text(f"⏭️ Skipped: {skipped_song['title']}\n📝 Queue is now empty.")
+        await update.message.reply_text(f"⏭️ Skipped: {skipped_song.title}\n📝 Queue is now empty.")
 
 async def stop_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /stop command"""
@@ -256,6 +457,31 @@ async def stop_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     queue_manager.clear_queue()
     await update.message.reply_text("⏹️ Stopped playback and cleared queue.")
 
+async def quality_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /quality command"""
+    chat_id = update.effective_chat.id
+    tiers = ', '.join(QUALITY_TIERS)
+    
+    if not context.args:
+        await update.message.reply_text(
+            f"🎚️ Audio quality: {get_chat_quality(chat_id)}\n"
+            f"Available: {tiers}\n"
+            f"Example: /quality low"
+        )
+        return
+    
+    quality = context.args[0].lower()
+    if quality not in QUALITY_TIERS:
+        await update.message.reply_text(f"❌ Unknown quality. Available: {tiers}")
+        return
+    
+    chat_settings.set_quality(chat_id, None if quality == DEFAULT_QUALITY else quality)
+    
+    await update.message.reply_text(
+        f"🎚️ Audio quality set to {quality} "
+        f"(at least {QUALITY_TIERS[quality]} kbps, smallest file that qualifies)"
+    )
+
 async def button_callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle inline keyboard button callbacks"""
     query = update.callback_query
@@ -267,83 +493,311 @@ async def button_callback_handler(update: Update, context: ContextTypes.DEFAULT_
         queue_manager = get_queue_manager(chat_id)
         
         try:
-            # Get video info
-            video_info = await youtube_service.get_video_info(f"https://youtube.com/watch?v={video_id}")
+            # Use the result shown on the keyboard; extract only if it expired
+            results = search_results.get((query.message.chat_id, query.message.message_id)) or {}
+            song = results.get(video_id)
+            if song is None:
+                video_info = await youtube_service.get_video_info(f"https://youtube.com/watch?v={video_id}")
+                song = Song.from_info(video_info)
             
             # Check duration limit
-            if video_info.get('duration', 0) > Config.MAX_DURATION:
-                await query.edit_message_text(
-                    f"❌ Song is too long ({format_duration(video_info['duration'])}). "
+            if song.duration > Config.MAX_DURATION:
+                status_editor.edit(
+                    query.message,
+                    f"❌ Song is too long ({format_duration(song.duration)}). "
                     f"Maximum duration is {format_duration(Config.MAX_DURATION)}."
                 )
                 return
             
             # Add to queue
-            position = queue_manager.add_song(video_info)
+            position = queue_manager.add_song(song)
             
             if position == 0:
-                await query.edit_message_text(
-                    f"🎵 Now playing: *{video_info['title']}*\n"
-                    f"Duration: {format_duration(video_info['duration'])}\n"
+                status_editor.edit(
+                    query.message,
+                    f"🎵 Now playing: *{song.title}*\n"
+                    f"Duration: {format_duration(song.duration)}\n"
                     f"Downloading and sending...",
                     parse_mode=ParseMode.MARKDOWN
                 )
                 
                 # Download and send audio
-                await download_and_send_audio(update, context, video_info, query.message)
+                start_delivery(update, context, song, query.message)
             else:
-                await query.edit_message_text(
-                    f"✅ Added to queue (position {position + 1}): *{video_info['title']}*\n"
-                    f"Duration: {format_duration(video_info['duration'])}",
+                status_editor.edit(
+                    query.message,
+                    f"✅ Added to queue (position {position + 1}): *{song.title}*\n"
+                    f"Duration: {format_duration(song.duration)}",
                     parse_mode=ParseMode.MARKDOWN
                 )
                 
         except Exception as e:
             logger.error(f"Error in button callback: {e}")
-            await query.edit_message_text("❌ An error occurred while processing your selection.")
+            status_editor.edit(query.message, "❌ An error occurred while processing your selection.")
+    
+    elif query.data == 'dlall':
+        # Taken out of the store so a second press can't send everything twice
+        results = search_results.pop((query.message.chat_id, query.message.message_id))
+        if not results:
+            status_editor.edit(query.message, "❌ These results have expired. Please search again.")
+            return
+        
+        songs = list(results.values())
+        status_editor.edit(query.message, f"💾 Sending {len(songs)} songs...")
+        start_batch_delivery(update, context, songs, query.message)
+
+async def send_cached_audio(context: ContextTypes.DEFAULT_TYPE, chat_id: int, song: Song) -> bool:
+    """Re-send a previously uploaded track by its Telegram file ID
+    
+    Returns:
+        True if the track was sent, False if it has to be downloaded
+    """
+    quality = get_chat_quality(chat_id)
+    cached = file_id_cache.get(song.id, quality)
+    if not cached:
+        return False
+    
+    try:
+        await context.bot.send_audio(
+            chat_id=chat_id,
+            audio=cached['file_id'],
+            title=song.title,
+            duration=cached.get('duration') or song.duration,
+            caption=f"🎵 {song.title}\n🔗 {song.url}"
+        )
+        return True
+    except BadRequest as e:
+        # Expired or foreign file IDs are rejected; fall back to uploading
+        logger.warning(f"Cached file ID for {song.id} rejected: {e}")
+        file_id_cache.invalidate(song.id, quality)
+        return False
+
+async def upload_audio(context: ContextTypes.DEFAULT_TYPE, chat_id: int, song: Song, audio):
+    """Upload audio to a chat and remember its Telegram file ID"""
+    sent_message = await context.bot.send_audio(
+        chat_id=chat_id,
+        audio=audio,
+        title=song.title,
+        duration=song.duration,
+        caption=f"🎵 {song.title}\n🔗 {song.url}"
+    )
+    
+    # Remember the upload so the next request can skip it
+    remember_upload(song, get_chat_quality(chat_id), sent_message.audio)
+
+def remember_upload(song: Song, quality: str, audio):
+    """Record the Telegram file ID of an uploaded track"""
+    if audio:
+        file_id_cache.put(
+            song.id,
+            quality,
+            audio.file_id,
+            file_size=audio.file_size,
+            duration=audio.duration
+        )
 
-async def download_and_send_audio(update: Update, context: ContextTypes.DEFAULT_TYPE, video_info: dict, message):
+def start_delivery(update: Update, context: ContextTypes.DEFAULT_TYPE, song: Song, message):
+    """Download and send a song in the background
+    
+    Updates of one chat are handled one after another, so waiting for the
+    download here would hold back that chat's next command.
+    """
+    context.application.create_task(
+        download_and_send_audio(update, context, song, message),
+        update=update
+    )
+
+async def download_and_send_audio(update: Update, context: ContextTypes.DEFAULT_TYPE, song: Song, message):
     """Download and send audio file to user"""
+    audio_path = None
+    chat_id = update.effective_chat.id
+    quality = get_chat_quality(chat_id)
+    title = song.title.replace('*', '').replace('_', '').replace('[', '').replace(']', '').replace('`', '')
     try:
+        # Tracks Telegram already has are sent without downloading
+        if await send_cached_audio(context, chat_id, song):
+            status_editor.edit(
+                message,
+                f"✅ Sent: {title}",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        async def report_position(position: int):
+            status_editor.edit(
+                message,
+                f"⏳ Waiting for a download slot: {title}\n"
+                f"Position in line: {position}"
+            )
+        
+        # Pipe the audio straight into the upload unless it's on disk already
+        if (Config.STREAMING_UPLOAD and
+                not youtube_service.audio_cache.contains(song.id, quality)):
+            stream = await youtube_service.open_audio_stream(
+                song.id,
+                chat_id=chat_id,
+                on_position=report_position,
+                quality=quality
+            )
+            if stream:
+                spool, ext = stream
+                with spool:
+                    status_editor.edit(
+                        message,
+                        f"📤 Sending: {title}",
+                        parse_mode=ParseMode.MARKDOWN
+                    )
+                    # In-memory spools have no file name for InputFile to use
+                    await upload_audio(
+                        context, chat_id, song,
+                        InputFile(spool.read(), filename=f"{song.id}.{ext}")
+                    )
+                
+                status_editor.edit(
+                    message,
+                    f"✅ Sent: {title}",
+                    parse_mode=ParseMode.MARKDOWN
+                )
+                return
+        
         # Download audio
-        audio_path = await youtube_service.download_audio(video_info['id'])
+        audio_path = await youtube_service.download_audio(
+            song.id,
+            chat_id=chat_id,
+            on_position=report_position,
+            quality=quality
+        )
         
         if not audio_path or not os.path.exists(audio_path):
-            await message.edit_text("❌ Failed to download audio.")
+            status_editor.edit(message, "❌ Failed to download audio.")
             return
         
         # Update message
-        title = video_info['title'].replace('*', '').replace('_', '').replace('[', '').replace(']', '').replace('`', '')
-        await message.edit_text(
+        status_editor.edit(
+            message,
             f"📤 Sending: {title}",
             parse_mode=ParseMode.MARKDOWN
         )
         
         # Send audio file
         with open(audio_path, 'rb') as audio_file:
-            await context.bot.send_audio(
-                chat_id=update.effective_chat.id,
-                audio=audio_file,
-                title=video_info['title'],
-                duration=video_info.get('duration', 0),
-                caption=f"🎵 {video_info['title']}\n🔗 https://youtube.com/watch?v={video_info['id']}"
-            )
+            await upload_audio(context, chat_id, song, audio_file)
         
-        # Clean up
-        try:
-            os.remove(audio_path)
-        except:
-            pass
-            
         # Update final message
-        await message.edit_text(
+        status_editor.edit(
+            message,
             f"✅ Sent: {title}",
             parse_mode=ParseMode.MARKDOWN
         )
         
     except Exception as e:
         logger.error(f"Error downloading/sending audio: {e}")
-        await message.edit_text("❌ Failed to download or send audio.")
+        status_editor.edit(message, "❌ Failed to download or send audio.")
+    finally:
+        # Keep the file cached for other chats, just unpin it
+        if audio_path:
+            youtube_service.release_audio(audio_path)
+
+def start_batch_delivery(update: Update, context: ContextTypes.DEFAULT_TYPE, songs: list, message):
+    """Send several songs in the background, see start_delivery"""
+    context.application.create_task(
+        send_songs(update, context, songs, message),
+        update=update
+    )
+
+async def send_songs(update: Update, context: ContextTypes.DEFAULT_TYPE, songs: list, message):
+    """Send songs as media groups of up to ten tracks per upload
+    
+    Tracks Telegram already has go into the album by file ID; the rest are
+    downloaded concurrently through the download scheduler. Albums are
+    split further so no request uploads more than Config.MAX_UPLOAD_BYTES.
+    A track that fails to download or is refused is reported in the total
+    but doesn't hold back the rest of its group.
+    """
+    chat_id = update.effective_chat.id
+    quality = get_chat_quality(chat_id)
+    sent = 0
+    
+    for start in range(0, len(songs), MAX_GROUP_SIZE):
+        group = songs[start:start + MAX_GROUP_SIZE]
+        tracks = []
+        try:
+            status_editor.edit(
+                message,
+                f"⏳ Preparing songs {start + 1}-{start + len(group)} of {len(songs)}..."
+            )
+            tracks = await prepare_group(chat_id, group, quality)
+            
+            status_editor.edit(
+                message,
+                f"📤 Sending songs {start + 1}-{start + len(group)} of {len(songs)}..."
+            )
+            for album in split_albums(tracks, Config.MAX_UPLOAD_BYTES):
+                sent += await send_audio_group(context.bot, chat_id, album)
+            
+            for track in tracks:
+                if track.path:
+                    remember_upload(track.song, quality, track.audio)
+                elif track.rejected:
+                    file_id_cache.invalidate(track.song.id, quality)
+                    if await send_downloaded(context, chat_id, track.song, quality):
+                        sent += 1
+        except Exception as e:
+            logger.error(f"Error sending songs {start + 1}-{start + len(group)} to chat {chat_id}: {e}")
+        finally:
+            # Keep the files cached for other chats, just unpin them
+            for track in tracks:
+                if track.path:
+                    youtube_service.release_audio(track.path)
+    
+    if sent == len(songs):
+        status_editor.edit(message, f"✅ Sent {sent} songs")
+    else:
+        status_editor.edit(message, f"⚠️ Sent {sent} of {len(songs)} songs, the rest failed to download or send")
+
+async def prepare_group(chat_id: int, songs: list, quality: str) -> list:
+    """Pair songs with a known file ID or a downloaded file
+    
+    Returns:
+        GroupTracks in song order, leaving out songs that failed to download
+    """
+    tracks = []
+    downloads = []
+    for song in songs:
+        cached = file_id_cache.get(song.id, quality)
+        track = GroupTrack(song, file_id=cached['file_id'] if cached else None)
+        tracks.append(track)
+        if not cached:
+            downloads.append(track)
+    
+    paths = await asyncio.gather(*(
+        youtube_service.download_audio(track.song.id, chat_id=chat_id, quality=quality)
+        for track in downloads
+    ))
+    for track, path in zip(downloads, paths):
+        track.path = path
+    
+    return [track for track in tracks if track.file_id or track.path]
+
+async def send_downloaded(context: ContextTypes.DEFAULT_TYPE, chat_id: int, song: Song, quality: str) -> bool:
+    """Download and upload one song whose file ID Telegram refused"""
+    audio_path = await youtube_service.download_audio(song.id, chat_id=chat_id, quality=quality)
+    if not audio_path:
+        return False
+    
+    try:
+        with open(audio_path, 'rb') as audio_file:
+            await upload_audio(context, chat_id, song, audio_file)
+        return True
+    except Exception as e:
+        logger.error(f"Error sending {song.id} to chat {chat_id}: {e}")
+        return False
+    finally:
+        youtube_service.release_audio(audio_path)
+
+async def shutdown_handler(application):
+    """Save pending queue changes before the bot exits"""
+    await queue_store.close()
 
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle bot errors"""
@@ -0,0 +1,149 @@
+"""
+Media Group
+Sends several audio tracks per Bot API call as a Telegram album
+"""
+
+import logging
+import os
+from typing import List, Optional
+from telegram import Audio, Bot, InputMediaAudio
+from telegram.error import BadRequest, NetworkError
+from bot.song import Song
+
+logger = logging.getLogger(__name__)
+
+MAX_GROUP_SIZE = 10  # Most items sendMediaGroup accepts in one call
+
+class GroupTrack:
+    """One track of a media group, sent by Telegram file ID or from a file"""
+    
+    __slots__ = ('song', 'file_id', 'path', 'audio', 'rejected')
+    
+    def __init__(self, song: Song, file_id: Optional[str] = None, path: Optional[str] = None):
+        """Initialize track
+        
+        Args:
+            song: Song being sent
+            file_id: File ID of an earlier upload, sent without uploading
+            path: Local audio file, used when there is no file ID
+        """
+        self.song = song
+        self.file_id = file_id
+        self.path = path
+        self.audio: Optional[Audio] = None  # Set once the track was sent
+        self.rejected = False  # Telegram refused the file ID
+
+def split_albums(tracks: List[GroupTrack], max_bytes: int) -> List[List[GroupTrack]]:
+    """Split tracks into albums whose uploaded files fit in one request
+    
+    Tracks sent by file ID upload nothing and go into any album. A file
+    larger than max_bytes on its own ends up alone.
+    
+    Args:
+        tracks: Tracks in sending order, at most MAX_GROUP_SIZE per album
+        max_bytes: Upload size limit of one Bot API request
+    """
+    albums = []
+    album = []
+    album_bytes = 0
+    for track in tracks:
+        size = _file_size(track.path) if track.path else 0
+        if album and (len(album) >= MAX_GROUP_SIZE or album_bytes + size > max_bytes):
+            albums.append(album)
+            album = []
+            album_bytes = 0
+        
+        album.append(track)
+        album_bytes += size
+    
+    if album:
+        albums.append(album)
+    return albums
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def _caption(song: Song) -> str:
+    return f"🎵 {song.title}\n🔗 {song.url}"
+
+def _input_media(track: GroupTrack) -> InputMediaAudio:
+    if track.file_id is not None:
+        return InputMediaAudio(
+            track.file_id,
+            caption=_caption(track.song),
+            title=track.song.title,
+            duration=track.song.duration
+        )
+    
+    # The file is read into the request right away, so it can be closed
+    with open(track.path, 'rb') as audio_file:
+        return InputMediaAudio(
+            audio_file,
+            caption=_caption(track.song),
+            title=track.song.title,
+            duration=track.song.duration
+        )
+
+async def send_audio_group(bot: Bot, chat_id: int, tracks: List[GroupTrack]) -> int:
+    """Send up to MAX_GROUP_SIZE tracks, as one album when there are several
+    
+    If the album fails, for example because one file ID went stale or the
+    upload timed out, each track is sent on its own so only the broken
+    ones are lost. Use split_albums to keep an album's upload in bounds.
+    Sent tracks get their Audio set; tracks whose file ID was refused are
+    marked rejected.
+    
+    Returns:
+        Number of tracks sent
+    """
+    if len(tracks) > MAX_GROUP_SIZE:
+        raise ValueError(f"A media group holds at most {MAX_GROUP_SIZE} tracks")
+    
+    if len(tracks) >= 2:
+        try:
+            media = [_input_media(track) for track in tracks]
+            
+            messages = await bot.send_media_group(chat_id=chat_id, media=media)
+            for track, message in zip(tracks, messages):
+                track.audio = message.audio
+            return len(tracks)
+        except (BadRequest, NetworkError) as e:
+            # NetworkError covers a too large request body (HTTP 413) and
+            # TimedOut; a lost album shouldn't lose all of its tracks
+            logger.warning(f"Media group for chat {chat_id} failed, sending tracks one by one: {e}")
+    
+    sent = 0
+    for track in tracks:
+        if await _send_track(bot, chat_id, track):
+            sent += 1
+    return sent
+
+async def _send_track(bot: Bot, chat_id: int, track: GroupTrack) -> bool:
+    try:
+        if track.file_id is not None:
+            message = await bot.send_audio(
+                chat_id=chat_id,
+                audio=track.file_id,
+                title=track.song.title,
+                duration=track.song.duration,
+                caption=_caption(track.song)
+            )
+        else:
+            with open(track.path, 'rb') as audio_file:
+                message = await bot.send_audio(
+                    chat_id=chat_id,
+                    audio=audio_file,
+                    title=track.song.title,
+                    duration=track.song.duration,
+                    caption=_caption(track.song)
+                )
+        track.audio = message.audio
+        return True
+    except (BadRequest, NetworkError) as e:
+        if track.file_id is not None and isinstance(e, BadRequest):
+            track.rejected = True
+        logger.warning(f"Couldn't send {track.song.id} to chat {chat_id}: {e}")
+        return False
@@ -0,0 +1,136 @@
+"""
+Message Editor
+Coalesces status message edits so they stay inside Telegram's flood limits
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Hashable
+from telegram.constants import ChatType
+from telegram.error import BadRequest, RetryAfter
+from bot.cache import TTLCache
+from bot.utils import retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+GROUP_CHAT_TYPES = (ChatType.GROUP, ChatType.SUPERGROUP)
+
+class MessageEditor:
+    """Rate-bounded, last-write-wins editor for status messages
+    
+    Only the newest pending text of a message is kept: intermediate states
+    that were replaced before their turn are dropped, edits that would not
+    change the message are skipped, and a RetryAfter from Telegram holds
+    back every edit in that chat for the time it asks for.
+    """
+    
+    def __init__(self, min_interval: float, group_interval: float):
+        """Initialize editor
+        
+        Args:
+            min_interval: Seconds between edits in one private chat
+            group_interval: Seconds between edits in one group chat
+        """
+        self.min_interval = min_interval
+        self.group_interval = group_interval
+        
+        # (chat_id, message_id) -> (message, text, kwargs) waiting to be sent
+        self._pending: Dict[Hashable, tuple] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        # (chat_id, message_id) -> content last shown, to skip no-op edits
+        self._shown = TTLCache(max_entries=10000, ttl=3600)
+        # chat_id -> monotonic time the next edit may go out
+        self._ready_at = TTLCache(max_entries=10000, ttl=3600)
+        
+        self.requested = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self.retry_after = 0
+        self.failed = 0
+    
+    def edit(self, message, text: str, **kwargs: Any):
+        """Schedule an edit of a message the bot sent
+        
+        Returns immediately. If an older edit of the same message is still
+        waiting, it is replaced by this one.
+        
+        Args:
+            message: telegram.Message to edit
+            text: New message text
+            **kwargs: Passed on to Message.edit_text, e.g. parse_mode
+        """
+        key = (message.chat_id, message.message_id)
+        self.requested += 1
+        
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = (message, text, kwargs)
+        
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.ensure_future(self._flush(key, message))
+    
+    async def flush(self, message):
+        """Wait until the pending edits of a message have been sent"""
+        task = self._tasks.get((message.chat_id, message.message_id))
+        if task:
+            await asyncio.shield(task)
+    
+    async def _flush(self, key: Hashable, message):
+        chat_id = message.chat_id
+        interval = self.group_interval if message.chat.type in GROUP_CHAT_TYPES else self.min_interval
+        
+        try:
+            while key in self._pending:
+                delay = self._ready_at.get(chat_id, 0) - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue  # Newer text or a RetryAfter may have arrived
+                
+                message, text, kwargs = self._pending.pop(key)
+                content = (text, tuple(sorted(kwargs.items())))
+                if self._shown.get(key) == content:
+                    self.skipped += 1
+                    continue
+                
+                self._ready_at.set(chat_id, time.monotonic() + interval)
+                await self._send(key, message, text, kwargs, content)
+        finally:
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+    
+    async def _send(self, key: Hashable, message, text: str, kwargs: Dict, content: tuple):
+        try:
+            await message.edit_text(text, **kwargs)
+            self._shown.set(key, content)
+            self.sent += 1
+        except RetryAfter as e:
+            self.retry_after += 1
+            wait = retry_after_seconds(e.retry_after)
+            logger.warning(f"Edits in chat {message.chat_id} flood-limited for {wait}s")
+            self._ready_at.set(message.chat_id, time.monotonic() + wait)
+            # Retry unless a newer text has replaced this one meanwhile
+            self._pending.setdefault(key, (message, text, kwargs))
+        except BadRequest as e:
+            if 'not modified' in str(e).lower():
+                self._shown.set(key, content)
+                self.skipped += 1
+            else:
+                self.failed += 1
+                logger.warning(f"Could not edit message {key}: {e}")
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error editing message {key}: {e}")
+    
+    def stats(self) -> Dict:
+        """Get edit counters"""
+        return {
+            'pending': len(self._pending),
+            'requested': self.requested,
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'skipped': self.skipped,
+            'retry_after': self.retry_after,
+            'failed': self.failed
+        }
@@ -0,0 +1,74 @@
+"""
+Metadata Store
+Persistent video metadata cache backed by SQLite
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Optional
+from bot.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+class MetadataStore(SQLiteStore):
+    """Video info dicts keyed by video ID, kept across restarts"""
+    
+    def __init__(self, db_path: str, max_age: float, memory_size: int = 2000):
+        """Initialize metadata store
+        
+        Args:
+            db_path: SQLite database file
+            max_age: Seconds before a stored entry is considered stale
+            memory_size: Number of entries kept in memory in front of SQLite
+        """
+        self.max_age = max_age
+        
+        # video_id -> (fetched_at, info) in memory; staleness is checked on every get
+        super().__init__(
+            db_path,
+            'CREATE TABLE IF NOT EXISTS video_metadata ('
+            'video_id TEXT PRIMARY KEY, '
+            'info TEXT NOT NULL, '
+            'fetched_at REAL NOT NULL)',
+            memory_size=memory_size,
+            memory_ttl=max_age
+        )
+    
+    def get(self, video_id: str) -> Optional[Dict]:
+        """Get fresh video info, or None if missing or stale"""
+        with self._lock:
+            entry = self._memory.get(video_id)
+            
+            if entry is None:
+                row = self._conn.execute(
+                    'SELECT fetched_at, info FROM video_metadata WHERE video_id = ?',
+                    (video_id,)
+                ).fetchone()
+                
+                if row is None:
+                    return None
+                
+                entry = (row[0], json.loads(row[1]))
+                self._memory.set(video_id, entry)
+            
+            fetched_at, info = entry
+            if time.time() - fetched_at > self.max_age:
+                return None
+            
+            return dict(info)
+    
+    def put(self, video_id: str, info: Dict):
+        """Store video info"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO video_metadata (video_id, info, fetched_at) '
+                    'VALUES (?, ?, ?)',
+                    (video_id, json.dumps(info), time.time())
+                )
+                self._conn.commit()
+                self._memory.set(video_id, (time.time(), dict(info)))
+        except sqlite3.Error as e:
+            logger.error(f"Error storing metadata for {video_id}: {e}")
@@ -0,0 +1,150 @@
+"""
+Prefetcher
+Downloads upcoming queue entries in the background so /skip is instant
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+from bot.download_scheduler import PRIORITY_PREFETCH
+from bot.format_selector import DEFAULT_QUALITY
+from bot.song import Song
+
+logger = logging.getLogger(__name__)
+
+class Prefetcher:
+    """Keeps the next few songs of every queue in the audio cache
+    
+    Each prefetched file stays pinned in the audio cache for as long as
+    the song is inside its chat's lookahead window, so eviction can't undo
+    the prefetch before the song is played.
+    """
+    
+    def __init__(self, youtube_service, lookahead: int, max_bytes: int,
+                 is_ready: Optional[Callable[[str, str], bool]] = None,
+                 quality_for: Optional[Callable[[Any], str]] = None):
+        """Initialize prefetcher
+        
+        Args:
+            youtube_service: YouTubeService used for downloads
+            lookahead: Number of songs after the current one to prefetch
+            max_bytes: Disk space prefetched files may pin in total
+            is_ready: Called with a video ID and quality tier; returns True
+                for videos that can be sent without a download, e.g. ones
+                with a known Telegram file ID
+            quality_for: Returns the quality tier of a chat
+        """
+        self.youtube_service = youtube_service
+        self.lookahead = lookahead
+        self.max_bytes = max_bytes
+        self.is_ready = is_ready
+        self.quality_for = quality_for
+        
+        # chat_id -> video_id -> running prefetch
+        self._tasks: Dict[Any, Dict[str, asyncio.Task]] = {}
+        # chat_id -> video_id -> (pinned path, size)
+        self._pinned: Dict[Any, Dict[str, tuple]] = {}
+        self.pinned_bytes = 0
+        
+        self.completed = 0
+        self.cancelled = 0
+        self.skipped = 0
+    
+    def sync(self, chat_id: Any, queue: List[Song]):
+        """Match running prefetches to a chat's current queue
+        
+        Args:
+            chat_id: Chat the queue belongs to
+            queue: Songs from the currently playing one onwards
+        """
+        # The current song stays in the window so it keeps its pin
+        # while /skip hands it over to the sender, but it is never
+        # started here: its sender downloads it at interactive priority
+        wanted = [song.id for song in queue[:self.lookahead + 1]]
+        current = wanted[0] if wanted else None
+        tasks = self._tasks.setdefault(chat_id, {})
+        pinned = self._pinned.setdefault(chat_id, {})
+        quality = self.quality_for(chat_id) if self.quality_for else DEFAULT_QUALITY
+        
+        # Drop prefetches for songs that left the window
+        for video_id in list(tasks):
+            if video_id not in wanted:
+                tasks.pop(video_id).cancel()
+                self.cancelled += 1
+        
+        for video_id in list(pinned):
+            if video_id not in wanted:
+                self._release(chat_id, video_id)
+        
+        for video_id in wanted:
+            if video_id in tasks or video_id in pinned or video_id == current:
+                continue
+            
+            if self.is_ready and self.is_ready(video_id, quality):
+                continue
+            
+            if self.pinned_bytes >= self.max_bytes:
+                self.skipped += 1
+                continue
+            
+            try:
+                task = asyncio.ensure_future(self._prefetch(chat_id, video_id, quality))
+            except RuntimeError:
+                return  # No running event loop
+            
+            tasks[video_id] = task
+        
+        if not tasks:
+            del self._tasks[chat_id]
+        if not pinned:
+            del self._pinned[chat_id]
+    
+    async def _prefetch(self, chat_id: Any, video_id: str, quality: str):
+        try:
+            path = await self.youtube_service.download_audio(
+                video_id, chat_id=chat_id, priority=PRIORITY_PREFETCH,
+                quality=quality
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error prefetching {video_id}: {e}")
+            path = None
+        finally:
+            tasks = self._tasks.get(chat_id)
+            if tasks and tasks.get(video_id) is asyncio.current_task():
+                del tasks[video_id]
+                if not tasks:
+                    del self._tasks[chat_id]
+        
+        if not path:
+            return
+        
+        size = _file_size(path)
+        self._pinned.setdefault(chat_id, {})[video_id] = (path, size)
+        self.pinned_bytes += size
+        self.completed += 1
+        logger.info(f"Prefetched {video_id} for chat {chat_id}")
+    
+    def _release(self, chat_id: Any, video_id: str):
+        path, size = self._pinned[chat_id].pop(video_id)
+        self.pinned_bytes -= size
+        self.youtube_service.release_audio(path)
+    
+    def stats(self) -> Dict:
+        """Get prefetch counters"""
+        return {
+            'running': sum(len(tasks) for tasks in self._tasks.values()),
+            'pinned_files': sum(len(pinned) for pinned in self._pinned.values()),
+            'pinned_bytes': self.pinned_bytes,
+            'completed': self.completed,
+            'cancelled': self.cancelled,
+            'skipped': self.skipped
+        }
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -4,102 +4,191 @@ Manages music playback queue for each chat
 """
 
 import logging
-from typing import List, Dict, Optional
+import random
+from typing import Any, Callable, List, Dict, Optional, Set, Tuple
+from bot.song import Song
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Finished slots are only compacted away once there are this many
+COMPACT_MIN_FINISHED = 64
+
 class QueueManager:
-    """Manages music queue for a chat"""
+    """Manages music queue for a chat
+    
+    Songs live in one list with a head index instead of being shifted on
+    every skip: skipping clears the head slot and advances the index, and
+    the finished prefix is dropped in one go once it makes up half of the
+    list, so skips are O(1) amortized. Song count and total duration of the
+    live part of the queue are kept up to date on every change.
+    """
     
-    def __init__(self):
-        """Initialize queue manager"""
-        self.queue: List[Dict] = []
+    def __init__(self, chat_id: Any = None,
+                 on_change: Optional[Callable[['QueueManager'], None]] = None,
+                 max_size: Optional[int] = None):
+        """Initialize queue manager
+        
+        Args:
+            chat_id: Chat this queue belongs to
+            on_change: Called with the queue manager after every change
+            max_size: Maximum queued songs, default Config.MAX_QUEUE_SIZE
+        """
+        self.queue: List[Optional[Song]] = []
+        self.current_index = 0  # Slots before this one hold finished songs
+        self.chat_id = chat_id
+        self.on_change = on_change
+        self.max_size = max_size or Config.MAX_QUEUE_SIZE
+        self.total_duration = 0
+    
+    def __len__(self) -> int:
+        return len(self.queue) - self.current_index
+    
+    def _changed(self):
+        """Notify the change listener"""
+        if self.on_change:
+            try:
+                self.on_change(self)
+            except Exception as e:
+                logger.error(f"Error in queue change listener: {e}")
+    
+    def restore(self, songs: List[Song]):
+        """Replace the queue with stored songs without notifying the listener
+        
+        Args:
+            songs: Songs from the currently playing one onwards
+        """
+        self.queue = list(songs)
         self.current_index = 0
+        self.total_duration = sum(song.duration for song in self.queue)
     
-    def add_song(self, song_info: Dict) -> int:
+    def add_song(self, song: Song) -> int:
         """Add a song to the queue
         
         Args:
-            song_info: Dictionary containing song information
-            
+            song: Song to add
+        
         Returns:
             Position in queue (0 means now playing)
         """
-        if len(self.queue) >= Config.MAX_QUEUE_SIZE:
-            raise Exception(f"Queue is full (max {Config.MAX_QUEUE_SIZE} songs)")
+        if len(self) >= self.max_size:
+            raise Exception(f"Queue is full (max {self.max_size} songs)")
         
-        self.queue.append(song_info)
-        return len(self.queue) - 1
+        self.queue.append(song)
+        self.total_duration += song.duration
+        self._changed()
+        return len(self) - 1
     
-    def get_current_song(self) -> Optional[Dict]:
+    def add_songs(self, songs: List[Song]) -> Tuple[int, int]:
+        """Add several songs with one capacity check and one change notice
+        
+        Songs that don't fit are left out rather than failing the batch.
+        
+        Args:
+            songs: Songs to add, in order
+        
+        Returns:
+            (position of the first added song, number of songs added)
+        """
+        room = self.max_size - len(self)
+        if room <= 0 and songs:
+            raise Exception(f"Queue is full (max {self.max_size} songs)")
+        
+        added = songs[:room]
+        position = len(self)
+        
+        self.queue.extend(added)
+        self.total_duration += sum(song.duration for song in added)
+        if added:
+            self._changed()
+        return position, len(added)
+    
+    def get_current_song(self) -> Optional[Song]:
         """Get currently playing song"""
-        if not self.queue or self.current_index >= len(self.queue):
+        if self.current_index >= len(self.queue):
             return None
         return self.queue[self.current_index]
     
-    def skip_song(self) -> Optional[Dict]:
+    def skip_song(self) -> Optional[Song]:
         """Skip current song and move to next
         
         Returns:
             Skipped song info or None if no song was playing
         """
-        if not self.queue or self.current_index >= len(self.queue):
+        if self.current_index >= len(self.queue):
             return None
         
         skipped_song = self.queue[self.current_index]
+        self.queue[self.current_index] = None  # Don't keep finished songs alive
         self.current_index += 1
+        self.total_duration -= skipped_song.duration
         
-        # Clean up finished songs
-        if self.current_index > 0:
-            self.queue = self.queue[self.current_index:]
+        # Clean up finished songs once they outnumber the live ones
+        if self.current_index >= COMPACT_MIN_FINISHED and self.current_index * 2 >= len(self.queue):
+            del self.queue[:self.current_index]
             self.current_index = 0
         
+        self._changed()
         return skipped_song
     
-    def get_queue(self) -> List[Dict]:
+    def get_queue(self) -> List[Song]:
         """Get current queue starting from current song"""
-        if not self.queue:
-            return []
-        
         return self.queue[self.current_index:]
     
+    def peek(self, count: int) -> List[Song]:
+        """Get the current song and the ones after it, at most count songs"""
+        return self.queue[self.current_index:self.current_index + count]
+    
     def clear_queue(self):
         """Clear the entire queue"""
         self.queue.clear()
         self.current_index = 0
+        self.total_duration = 0
+        self._changed()
     
-    def remove_song(self, index: int) -> Optional[Dict]:
+    def remove_song(self, index: int) -> Optional[Song]:
         """Remove a song from the queue by index
         
         Args:
             index: Index in the current queue (0 = currently playing)
-            
+        
         Returns:
             Removed song info or None if index is invalid
         """
-        actual_index = self.current_index + index
-        
-        if actual_index < 0 or actual_index >= len(self.queue):
+        if index < 0 or index >= len(self):
             return None
         
-        removed_song = self.queue.pop(actual_index)
-        
-        # Adjust current index if needed
-        if actual_index < self.current_index:
-            self.current_index -= 1
+        removed_song = self.queue.pop(self.current_index + index)
+        self.total_duration -= removed_song.duration
         
+        self._changed()
         return removed_song
     
+    def discard_songs(self, video_ids: Set[str]) -> int:
+        """Remove every upcoming song with one of the given video IDs
+        
+        The currently playing song is kept.
+        
+        Returns:
+            Number of songs removed
+        """
+        upcoming = self.queue[self.current_index + 1:]
+        kept = [song for song in upcoming if song.id not in video_ids]
+        removed = len(upcoming) - len(kept)
+        
+        if removed:
+            self.queue[self.current_index + 1:] = kept
+            self.total_duration = sum(song.duration for song in self.queue[self.current_index:])
+            self._changed()
+        return removed
+    
     def get_queue_info(self) -> Dict:
         """Get queue information"""
-        current_queue = self.get_queue()
-        
         return {
-            'total_songs': len(current_queue),
+            'total_songs': len(self),
             'current_song': self.get_current_song(),
-            'queue_duration': sum(song.get('duration', 0) for song in current_queue),
-            'is_empty': len(current_queue) == 0
+            'queue_duration': self.total_duration,
+            'is_empty': len(self) == 0
         }
     
     def move_song(self, from_index: int, to_index: int) -> bool:
@@ -108,14 +197,14 @@ class QueueManager:
         Args:
             from_index: Current position (0 = currently playing)
             to_index: New position
-            
+        
         Returns:
             True if successful, False otherwise
         """
-        current_queue = self.get_queue()
+        size = len(self)
         
-        if (from_index < 0 or from_index >= len(current_queue) or 
-            to_index < 0 or to_index >= len(current_queue) or
+        if (from_index < 0 or from_index >= size or
+            to_index < 0 or to_index >= size or
             from_index == to_index):
             return False
         
@@ -130,18 +219,16 @@ class QueueManager:
         song = self.queue.pop(actual_from)
         self.queue.insert(actual_to, song)
         
+        self._changed()
         return True
     
     def shuffle_queue(self):
         """Shuffle the queue (excluding currently playing song)"""
-        import random
-        
-        if len(self.queue) <= self.current_index + 1:
+        if len(self) <= 1:
             return  # Nothing to shuffle
         
-        # Shuffle only the upcoming songs
+        # Shuffle only the upcoming songs, in place
         upcoming_songs = self.queue[self.current_index + 1:]
         random.shuffle(upcoming_songs)
-        
-        # Reconstruct queue
-        self.queue = (self.queue[:self.current_index + 1] + upcoming_songs)
+        self.queue[self.current_index + 1:] = upcoming_songs
+        self._changed()
@@ -0,0 +1,110 @@
+"""
+Queue Registry
+Keeps the queue managers of active chats in memory and spills idle ones
+"""
+
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from bot.queue_manager import QueueManager
+from bot.queue_store import QueueStore
+from bot.song import Song
+
+logger = logging.getLogger(__name__)
+
+class QueueRegistry:
+    """LRU registry of resident queue managers backed by a QueueStore
+    
+    Chats idle for longer than idle_timeout, and the least recently used
+    chats beyond max_resident, are dropped from memory. Their queues are
+    already on their way to the store through write-behind, so the next
+    access simply rehydrates them from there.
+    """
+    
+    def __init__(self, factory: Callable[[Any], QueueManager], store: QueueStore,
+                 max_resident: int, idle_timeout: float,
+                 on_evict: Optional[Callable[[Any], None]] = None):
+        """Initialize registry
+        
+        Args:
+            factory: Creates an empty queue manager for a chat ID
+            store: Where queues are saved and restored from
+            max_resident: Most queue managers kept in memory at once
+            idle_timeout: Seconds without access before a chat is evicted
+            on_evict: Called with the chat ID of every evicted chat
+        """
+        self.factory = factory
+        self.store = store
+        self.max_resident = max_resident
+        self.idle_timeout = idle_timeout
+        self.on_evict = on_evict
+        
+        # chat_id -> (last access, queue manager), least recently used first
+        self._resident: OrderedDict = OrderedDict()
+        
+        self.hits = 0
+        self.rehydrated = 0
+        self.evicted = 0
+    
+    def __len__(self) -> int:
+        return len(self._resident)
+    
+    def __contains__(self, chat_id: Any) -> bool:
+        return chat_id in self._resident
+    
+    def get(self, chat_id: Any) -> QueueManager:
+        """Get the queue manager of a chat, rehydrating it if needed"""
+        now = time.monotonic()
+        entry = self._resident.pop(chat_id, None)
+        
+        if entry is not None:
+            queue_manager = entry[1]
+            self.hits += 1
+        else:
+            queue_manager = self.factory(chat_id)
+            queue_manager.restore(self.store.load(chat_id))
+            self.rehydrated += 1
+        
+        self._resident[chat_id] = (now, queue_manager)
+        self._evict(now)
+        return queue_manager
+    
+    def _evict(self, now: float):
+        resident = self._resident
+        while resident:
+            chat_id, (last_access, _) = next(iter(resident.items()))
+            if len(resident) <= self.max_resident and now - last_access < self.idle_timeout:
+                break
+            
+            del resident[chat_id]
+            self.evicted += 1
+            
+            if self.on_evict:
+                try:
+                    self.on_evict(chat_id)
+                except Exception as e:
+                    logger.error(f"Error in queue eviction listener: {e}")
+    
+    def stats(self) -> Dict:
+        """Get resident counts and approximate memory use"""
+        queued = 0
+        resident_bytes = sys.getsizeof(self._resident)
+        for _, queue_manager in self._resident.values():
+            queued += len(queue_manager)
+            resident_bytes += (
+                sys.getsizeof(queue_manager) +
+                sys.getsizeof(queue_manager.__dict__) +
+                sys.getsizeof(queue_manager.queue)
+            )
+        
+        return {
+            'resident_chats': len(self._resident),
+            'queued_songs': queued,
+            'live_songs': Song.live_count(),
+            'resident_bytes': resident_bytes,
+            'hits': self.hits,
+            'rehydrated': self.rehydrated,
+            'evicted': self.evicted
+        }
@@ -0,0 +1,153 @@
+"""
+Queue Store
+Keeps chat queues across restarts with write-behind batching
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from bot.song import Song
+from bot.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+class QueueStore(SQLiteStore):
+    """Snapshots chat queues into SQLite off the event loop
+    
+    A queue change only marks the chat dirty. Once per flush interval all
+    dirty queues are snapshotted, which is cheap because Songs are
+    immutable, and written in one transaction on a worker thread. A chat
+    changed many times between flushes costs one row write.
+    """
+    
+    def __init__(self, db_path: str, flush_interval: float = 1.0):
+        """Initialize queue store
+        
+        Args:
+            db_path: SQLite database file
+            flush_interval: Seconds changes are collected before writing
+        """
+        super().__init__(
+            db_path,
+            'CREATE TABLE IF NOT EXISTS chat_queues ('
+            'chat_id INTEGER PRIMARY KEY, '
+            'songs TEXT NOT NULL, '
+            'updated_at REAL NOT NULL)'
+        )
+        self.flush_interval = flush_interval
+        
+        # chat_id -> QueueManager changed since the last flush
+        self._dirty: Dict[Any, Any] = {}
+        # chat_id -> songs in the batch being written right now
+        self._writing: Dict[Any, List[Song]] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        
+        self.loads = 0
+        self.rows_written = 0
+        self.batches = 0
+    
+    def load(self, chat_id: Any) -> List[Song]:
+        """Get the stored queue of a chat, current song first"""
+        # Changes that haven't reached the database yet are newer than it
+        queue_manager = self._dirty.get(chat_id)
+        if queue_manager is not None:
+            return queue_manager.get_queue()
+        if chat_id in self._writing:
+            return list(self._writing[chat_id])
+        
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT songs FROM chat_queues WHERE chat_id = ?',
+                (chat_id,)
+            ).fetchone()
+        self.loads += 1
+        
+        if row is None:
+            return []
+        
+        try:
+            return [Song.from_info(info) for info in json.loads(row[0])]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Dropping unreadable stored queue of chat {chat_id}: {e}")
+            return []
+    
+    def mark_dirty(self, queue_manager):
+        """Schedule a queue to be written with the next batch"""
+        self._dirty[queue_manager.chat_id] = queue_manager
+        
+        if self._flusher is None or self._flusher.done():
+            try:
+                self._flusher = asyncio.ensure_future(self._flush_periodically())
+            except RuntimeError:
+                pass  # No running event loop; flush() or close() writes it
+    
+    async def _flush_periodically(self):
+        while self._dirty:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    async def flush(self):
+        """Write every dirty queue now"""
+        async with self._flush_lock:
+            batch = self._snapshot()
+            if not batch:
+                return
+            
+            self._writing = dict(batch)
+            try:
+                await asyncio.to_thread(self._write, batch)
+            finally:
+                self._writing = {}
+    
+    def _snapshot(self) -> List[Tuple[Any, List[Song]]]:
+        batch = [(chat_id, queue_manager.get_queue()) for chat_id, queue_manager in self._dirty.items()]
+        self._dirty.clear()
+        return batch
+    
+    def _write(self, batch: List[Tuple[Any, List[Song]]]):
+        now = time.time()
+        upserts = []
+        deletes = []
+        for chat_id, songs in batch:
+            if songs:
+                upserts.append((chat_id, json.dumps([song.to_dict() for song in songs]), now))
+            else:
+                deletes.append((chat_id,))
+        
+        try:
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO chat_queues (chat_id, songs, updated_at) '
+                        'VALUES (?, ?, ?)',
+                        upserts
+                    )
+                    self._conn.executemany('DELETE FROM chat_queues WHERE chat_id = ?', deletes)
+            self.rows_written += len(batch)
+            self.batches += 1
+        except sqlite3.Error as e:
+            logger.error(f"Error writing {len(batch)} chat queues: {e}")
+    
+    def stats(self) -> Dict:
+        """Get persistence counters"""
+        return {
+            'dirty': len(self._dirty),
+            'loads': self.loads,
+            'rows_written': self.rows_written,
+            'batches': self.batches
+        }
+    
+    async def close(self):
+        """Write pending changes and close the database connection"""
+        # Waits for a batch already being written, so nothing older lands last
+        await self.flush()
+        
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        
+        super().close()
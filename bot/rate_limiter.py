@@ -0,0 +1,285 @@
+"""
+Rate Limiter
+Throttles and prioritizes every outgoing Bot API request
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Union
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+from bot.cache import TTLCache
+from bot.utils import retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+# Lower values are sent first
+PRIORITY_CALLBACK = 0  # Button presses show a spinner until answered
+PRIORITY_MESSAGE = 1
+PRIORITY_UPLOAD = 2
+
+ENDPOINT_PRIORITIES = {
+    'answerCallbackQuery': PRIORITY_CALLBACK,
+    'sendAudio': PRIORITY_UPLOAD,
+    'sendDocument': PRIORITY_UPLOAD,
+    'sendVoice': PRIORITY_UPLOAD,
+    'sendMediaGroup': PRIORITY_UPLOAD
+}
+
+class TokenBucket:
+    """Classic token bucket refilled continuously"""
+    
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+    
+    def __init__(self, rate: float, capacity: float):
+        """Initialize a full bucket
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens, i.e. the allowed burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def try_take(self, now: Optional[float] = None) -> bool:
+        """Take a token if one is available"""
+        self._refill(now if now is not None else time.monotonic())
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+    
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds until a token will be available"""
+        self._refill(now if now is not None else time.monotonic())
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+class OutboundRateLimiter(BaseRateLimiter[int]):
+    """Priority scheduler for outgoing Bot API requests
+    
+    Requests wait in one priority queue and are released while both the
+    global bucket (Telegram allows about 30 requests a second overall) and,
+    for groups, the chat's bucket (about 20 messages a minute) have tokens.
+    Callback answers go first and uploads last; a request for a throttled
+    group never holds back requests for other chats.
+    
+    Pass an int as rate_limit_args to override a request's priority.
+    """
+    
+    def __init__(self, overall_rate: float = 30, group_per_minute: float = 20,
+                 max_retries: int = 0):
+        """Initialize rate limiter
+        
+        Args:
+            overall_rate: Requests per second across all chats
+            group_per_minute: Messages per minute in one group chat
+            max_retries: Times a request is retried after a RetryAfter
+                before the error is passed on to the caller
+        """
+        self.overall_rate = overall_rate
+        self.group_per_minute = group_per_minute
+        self.max_retries = max_retries
+        
+        self._global = TokenBucket(overall_rate, overall_rate)
+        # An idle bucket is full again after a minute, so it can be dropped
+        self._groups = TTLCache(max_entries=100000, ttl=60)
+        # chat_id (None for everything) -> monotonic time RetryAfter ends
+        self._blocked_until = TTLCache(max_entries=100000, ttl=3600)
+        
+        # Heap of [priority, sequence, chat_id, future], smallest first;
+        # entries of cancelled callers are dropped when they are popped
+        self._waiting: List[list] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        
+        self.peak_queued = 0
+        self.retry_after = 0
+        # priority -> [requests, total wait, max wait]
+        self._waits: Dict[int, list] = {}
+    
+    async def initialize(self) -> None:
+        """Nothing to set up; the dispatcher starts with the first request"""
+    
+    async def shutdown(self) -> None:
+        """Stop the dispatcher and fail requests that are still waiting"""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        
+        for entry in self._waiting:
+            entry[3].cancel()
+        self._waiting.clear()
+    
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Union[bool, Dict, List[Dict]]]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> Union[bool, Dict, List[Dict]]:
+        """Wait for a send slot, then make the request"""
+        if rate_limit_args is not None:
+            priority = rate_limit_args
+        else:
+            priority = ENDPOINT_PRIORITIES.get(endpoint, PRIORITY_MESSAGE)
+        chat_id = data.get('chat_id')
+        
+        retries = 0
+        while True:
+            await self._acquire(priority, chat_id)
+            
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self.retry_after += 1
+                wait = retry_after_seconds(e.retry_after)
+                logger.warning(f"{endpoint} to chat {chat_id} flood-limited for {wait}s")
+                self._blocked_until.set(chat_id, time.monotonic() + wait)
+                self._wake()
+                
+                if retries >= self.max_retries:
+                    raise
+                retries += 1
+    
+    async def _acquire(self, priority: int, chat_id: Any):
+        future = asyncio.get_running_loop().create_future()
+        queued_at = time.monotonic()
+        
+        heapq.heappush(self._waiting, [priority, next(self._sequence), chat_id, future])
+        self.peak_queued = max(self.peak_queued, len(self._waiting))
+        self._wake()
+        
+        await future
+        
+        wait = time.monotonic() - queued_at
+        counters = self._waits.setdefault(priority, [0, 0.0, 0.0])
+        counters[0] += 1
+        counters[1] += wait
+        counters[2] = max(counters[2], wait)
+    
+    def _wake(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+    
+    async def _dispatch(self):
+        while self._waiting:
+            self._wakeup.clear()
+            delay = self._release_next()
+            
+            if delay == 0 or not self._waiting:
+                continue
+            
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _release_next(self) -> Optional[float]:
+        """Release the most urgent request that may go out now
+        
+        Returns:
+            0 if a request was released, else the seconds until one could
+            be, or None if that depends only on new requests arriving
+        """
+        now = time.monotonic()
+        
+        blocked = self._blocked_until.get(None, 0) - now
+        if blocked > 0:
+            return blocked
+        
+        global_wait = self._global.wait_time(now)
+        if global_wait > 0:
+            return global_wait
+        
+        next_delay = None
+        held = []
+        released = False
+        while self._waiting:
+            entry = heapq.heappop(self._waiting)
+            priority, _, chat_id, future = entry
+            if future.done():
+                # The caller was cancelled while waiting
+                continue
+            
+            delay = self._chat_wait(chat_id, now)
+            if delay > 0:
+                next_delay = delay if next_delay is None else min(next_delay, delay)
+                held.append(entry)
+                continue
+            
+            bucket = self._group_bucket(chat_id)
+            if bucket:
+                bucket.try_take(now)
+                self._groups.set(chat_id, bucket)
+            self._global.try_take(now)
+            
+            future.set_result(None)
+            released = True
+            break
+        
+        # Requests of throttled chats go back in line for the next round
+        for entry in held:
+            heapq.heappush(self._waiting, entry)
+        
+        return 0 if released else next_delay
+    
+    def _chat_wait(self, chat_id: Any, now: float) -> float:
+        wait = self._blocked_until.get(chat_id, 0) - now
+        
+        bucket = self._group_bucket(chat_id)
+        if bucket:
+            wait = max(wait, bucket.wait_time(now))
+        
+        return max(0.0, wait)
+    
+    def _group_bucket(self, chat_id: Any) -> Optional[TokenBucket]:
+        # Group and channel IDs are negative; channels may be @usernames
+        if chat_id is None or (isinstance(chat_id, int) and chat_id > 0):
+            return None
+        
+        bucket = self._groups.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.group_per_minute / 60, self.group_per_minute)
+            self._groups.set(chat_id, bucket)
+        return bucket
+    
+    def stats(self) -> Dict:
+        """Get queue depth and wait-time counters"""
+        queued: Dict[int, int] = {}
+        for priority, _, _, future in self._waiting:
+            if not future.done():
+                queued[priority] = queued.get(priority, 0) + 1
+        
+        waits = {
+            priority: {
+                'requests': requests,
+                'avg_wait': total / requests if requests else 0.0,
+                'max_wait': longest
+            }
+            for priority, (requests, total, longest) in self._waits.items()
+        }
+        
+        return {
+            'queued': sum(queued.values()),
+            'queued_by_priority': queued,
+            'peak_queued': self.peak_queued,
+            'throttled_groups': len(self._groups),
+            'retry_after': self.retry_after,
+            'waits': waits
+        }
@@ -0,0 +1,89 @@
+"""
+Request Limiter
+Per-user admission control for incoming commands and button presses
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class RequestLimiter:
+    """Token buckets for many keys, stored as plain tuples
+    
+    Each key costs one (tokens, updated, warned) tuple in an OrderedDict
+    kept in last-use order. A bucket left alone long enough to refill
+    completely is indistinguishable from a new one, so idle keys are
+    dropped from the front as new requests come in; every check is O(1)
+    amortized regardless of how many users the bot has seen.
+    """
+    
+    def __init__(self, per_minute: float, burst: Optional[float] = None,
+                 max_keys: int = 100000):
+        """Initialize limiter
+        
+        Args:
+            per_minute: Sustained requests allowed per key and minute
+            burst: Requests a fresh key may make at once, default per_minute
+            max_keys: Hard cap on tracked keys, oldest dropped first
+        """
+        self.rate = per_minute / 60
+        self.burst = burst if burst is not None else per_minute
+        self.max_keys = max_keys
+        self.idle_after = self.burst / self.rate  # Time to refill completely
+        
+        # key -> (tokens, updated, warned), least recently used first
+        self._buckets: OrderedDict = OrderedDict()
+        
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+    
+    def check(self, key: Hashable) -> Tuple[bool, bool]:
+        """Spend a token for key if it has one
+        
+        Returns:
+            (allowed, warn): warn is True for the first rejection after an
+            allowed request, so the user is told once rather than on every
+            further attempt
+        """
+        now = time.monotonic()
+        state = self._buckets.pop(key, None)
+        
+        if state is None:
+            tokens, warned = self.burst, False
+        else:
+            tokens = min(self.burst, state[0] + (now - state[1]) * self.rate)
+            warned = state[2]
+        
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now, False)
+            self.allowed += 1
+            result = (True, False)
+        else:
+            self._buckets[key] = (tokens, now, True)
+            self.rejected += 1
+            result = (False, not warned)
+        
+        self._evict(now)
+        return result
+    
+    def _evict(self, now: float):
+        buckets = self._buckets
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if len(buckets) <= self.max_keys and now - oldest[1] < self.idle_after:
+                break
+            buckets.popitem(last=False)
+            self.evicted += 1
+    
+    def stats(self) -> Dict:
+        """Get admission counters"""
+        return {
+            'tracked_keys': len(self._buckets),
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+            'evicted': self.evicted
+        }
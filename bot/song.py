@@ -0,0 +1,97 @@
+"""
+Song
+Compact, immutable track record shared by every queue holding the track
+"""
+
+import logging
+import sys
+import weakref
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+class Song:
+    """A queued track
+    
+    Uses __slots__ instead of a per-instance dict and keeps only what
+    queues and handlers read. Song.from_info hands out one shared instance
+    per video ID for as long as any queue holds it, so a track queued in a
+    thousand chats is stored once. Only songs with a known duration are
+    shared; a partial entry never stands in for full info that comes later.
+    """
+    
+    __slots__ = ('id', 'title', 'duration', 'uploader', '__weakref__')
+    
+    # video_id -> live Song
+    _registry: 'weakref.WeakValueDictionary[str, Song]' = weakref.WeakValueDictionary()
+    
+    def __init__(self, id: str, title: str, duration: int = 0, uploader: str = 'Unknown'):
+        """Initialize song
+        
+        Args:
+            id: YouTube video ID
+            title: Video title
+            duration: Length in seconds, 0 if unknown
+            uploader: Channel name
+        """
+        set_attr = object.__setattr__
+        set_attr(self, 'id', sys.intern(id))
+        set_attr(self, 'title', sys.intern(title))
+        set_attr(self, 'duration', int(duration))
+        set_attr(self, 'uploader', sys.intern(uploader))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Song is immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Song is immutable")
+    
+    def __reduce__(self):
+        return (Song, (self.id, self.title, self.duration, self.uploader))
+    
+    def __repr__(self) -> str:
+        return f"Song({self.id!r}, {self.title!r}, {self.duration})"
+    
+    @property
+    def url(self) -> str:
+        """YouTube watch URL"""
+        return f"https://youtube.com/watch?v={self.id}"
+    
+    @classmethod
+    def from_info(cls, info) -> 'Song':
+        """Get the shared Song for a video info dict from YouTubeService
+        
+        Args:
+            info: Video info dict, or a Song which is returned as is
+        """
+        if isinstance(info, Song):
+            return info
+        
+        song = cls._registry.get(info['id'])
+        if song is not None:
+            return song
+        
+        song = cls(
+            info['id'],
+            info.get('title') or 'Unknown',
+            info.get('duration') or 0,
+            info.get('uploader') or 'Unknown'
+        )
+        # Flat entries of live streams and some playlists have no duration
+        if song.duration:
+            cls._registry[song.id] = song
+        return song
+    
+    @classmethod
+    def live_count(cls) -> int:
+        """Number of distinct songs currently alive"""
+        return len(cls._registry)
+    
+    def to_dict(self) -> Dict:
+        """Get the song as a plain dict"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'duration': self.duration,
+            'uploader': self.uploader
+        }
@@ -0,0 +1,50 @@
+"""
+SQLite Store
+Shared setup for state kept in the bot's SQLite database
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from typing import Optional
+from bot.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+class SQLiteStore:
+    """Base class for a table in the state database
+    
+    Opens a WAL-mode connection that the event loop and executor threads
+    share, guarded by _lock, creates the store's table and optionally puts
+    a bounded in-memory cache in front of it.
+    """
+    
+    def __init__(self, db_path: str, schema: str, memory_size: Optional[int] = None,
+                 memory_ttl: float = float('inf')):
+        """Open the database and create the store's table
+        
+        Args:
+            db_path: SQLite database file
+            schema: CREATE TABLE IF NOT EXISTS statement for the table
+            memory_size: Number of entries kept in memory in front of
+                SQLite, or None for no memory cache
+            memory_ttl: Seconds an entry stays in the memory cache
+        """
+        self._lock = threading.Lock()
+        self._memory = TTLCache(max_entries=memory_size, ttl=memory_ttl) if memory_size else None
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(schema)
+        self._conn.commit()
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
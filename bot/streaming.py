@@ -0,0 +1,60 @@
+"""
+Streaming
+Fetches audio straight into an in-memory spool for upload, without
+writing a file to the temp directory
+"""
+
+import logging
+import tempfile
+from typing import Dict, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+class AudioTooLargeError(Exception):
+    """Raised when a stream grows past the allowed size"""
+
+async def spool_audio(url: str, headers: Optional[Dict] = None,
+                      max_memory: int = 32 * 1024 * 1024,
+                      max_bytes: Optional[int] = None,
+                      timeout: float = 60.0) -> tempfile.SpooledTemporaryFile:
+    """Download a media URL into a spooled buffer
+    
+    The buffer stays in memory up to max_memory bytes and only then rolls
+    over to an anonymous temporary file, which never shows up in the temp
+    directory and is gone once closed.
+    
+    Args:
+        url: Direct media URL, e.g. the one yt-dlp picked for a format
+        headers: HTTP headers yt-dlp requires for that URL
+        max_memory: Bytes kept in memory before spilling to disk
+        max_bytes: Abort with AudioTooLargeError beyond this size
+        timeout: Network timeout in seconds
+    
+    Returns:
+        Spool positioned at the start, ready to be read by the uploader.
+        The caller must close it.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    
+    try:
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+            async with client.stream('GET', url, headers=headers) as response:
+                response.raise_for_status()
+                
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    spool.write(chunk)
+                    
+                    if max_bytes is not None and spool.tell() > max_bytes:
+                        raise AudioTooLargeError(
+                            f"Stream exceeds {max_bytes} bytes"
+                        )
+    except BaseException:
+        spool.close()
+        raise
+    
+    logger.info(f"Spooled {spool.tell()} bytes from stream")
+    spool.seek(0)
+    return spool
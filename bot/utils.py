@@ -54,6 +54,45 @@ def extract_video_id(url: str) -> Optional[str]:
     
     return None
 
+# Mixes (RD...) and uploads lists (UL...) are generated per viewer and have
+# no end, so they are never queued as playlists
+AUTO_PLAYLIST_PREFIXES = ('RD', 'UL')
+
+def _parse_youtube_url(url: str):
+    """Parse a YouTube URL, None if it points elsewhere"""
+    parsed = urlparse(url if '://' in url else f"https://{url}")
+    if not re.search(r'(^|\.)(youtube|youtube-nocookie)\.com$|^youtu\.be$', parsed.netloc):
+        return None
+    return parsed
+
+def extract_playlist_id(url: str) -> Optional[str]:
+    """Extract playlist ID from a YouTube URL with a list parameter
+    
+    Auto-generated lists such as mixes are ignored.
+    """
+    parsed = _parse_youtube_url(url)
+    if parsed is None:
+        return None
+    
+    playlist_ids = parse_qs(parsed.query).get('list')
+    if not playlist_ids or playlist_ids[0].startswith(AUTO_PLAYLIST_PREFIXES):
+        return None
+    return playlist_ids[0]
+
+def is_playlist_url(url: str) -> bool:
+    """Check if URL points at a YouTube playlist
+    
+    A video opened from a playlist (watch?v=...&list=...) counts as that
+    video, so only the song the user was looking at gets queued.
+    """
+    parsed = _parse_youtube_url(url)
+    if parsed is None:
+        return False
+    
+    if 'v' in parse_qs(parsed.query) or (parsed.netloc == 'youtu.be' and parsed.path.strip('/')):
+        return False
+    return extract_playlist_id(url) is not None
+
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for file system"""
     # Remove invalid characters
@@ -98,6 +137,10 @@ def validate_search_query(query: str) -> bool:
     
     return True
 
+def normalize_query(query: str) -> str:
+    """Normalize search query for use as a cache key"""
+    return ' '.join(query.lower().split())
+
 def get_file_extension(mime_type: str) -> str:
     """Get file extension from MIME type"""
     mime_map = {
@@ -133,7 +176,7 @@ def clean_temp_directory(temp_dir: str, max_age_hours: int = 24):
                         logger.info(f"Removed old temp file: {filename}")
                     except Exception as e:
                         logger.error(f"Error removing temp file {filename}: {e}")
-                        
+    
     except Exception as e:
         logger.error(f"Error cleaning temp directory: {e}")
 
@@ -165,6 +208,15 @@ def rate_limit_key(user_id: int, chat_id: int) -> str:
     """Generate rate limit key for user"""
     return f"rate_limit_{user_id}_{chat_id}"
 
+def retry_after_seconds(retry_after) -> float:
+    """Get the wait of a RetryAfter error in seconds
+    
+    Newer python-telegram-bot versions report a timedelta instead of an int.
+    """
+    if hasattr(retry_after, 'total_seconds'):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
 def log_user_action(user_id: int, username: str, action: str, details: str = ""):
     """Log user actions for monitoring"""
     logger.info(
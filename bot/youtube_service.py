@@ -5,50 +5,199 @@ Handles YouTube search and audio extraction using yt-dlp
 
 import logging
 import asyncio
-import yt_dlp
 import os
-from typing import List, Dict, Optional
+import shutil
+import tempfile
+import threading
+import yt_dlp
+from yt_dlp.utils import determine_protocol
+from concurrent.futures import wait
+from typing import List, Dict, Optional, Tuple
 from config import Config
+from bot.audio_cache import AudioCache
+from bot.cache import TTLCache, SingleFlight
+from bot.executors import Executors
+from bot.format_selector import (
+    DEFAULT_QUALITY, baseline_format, estimate_size, select_audio_format
+)
+from bot.ytdl_pool import YoutubeDLPool
+from bot.download_scheduler import DownloadScheduler, PRIORITY_INTERACTIVE, PositionCallback
+from bot.metadata_store import MetadataStore
+from bot.streaming import spool_audio
+from bot.utils import normalize_query, extract_video_id
 
 logger = logging.getLogger(__name__)
 
+INFO_OPTIONS = {
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': False
+}
+
+# YoutubeDL of the current extraction worker process
+_process_ytdl = None
+
+def _info_to_dict(info: Dict) -> Dict:
+    """Build the video info dict handlers and queues work with"""
+    return {
+        'id': info.get('id', ''),
+        'title': info.get('title', 'Unknown'),
+        'duration': info.get('duration', 0),
+        'uploader': info.get('uploader', 'Unknown'),
+        'view_count': info.get('view_count', 0),
+        'url': info.get('webpage_url', ''),
+        'thumbnail': info.get('thumbnail', '')
+    }
+
+def extract_video_info(url: str) -> Optional[Dict]:
+    """Full metadata extraction, run in an extraction worker process"""
+    global _process_ytdl
+    if _process_ytdl is None:
+        _process_ytdl = yt_dlp.YoutubeDL(dict(INFO_OPTIONS))
+    
+    try:
+        info = _process_ytdl.extract_info(url, download=False)
+    except Exception as e:
+        # yt-dlp errors carry unpicklable state; send back only the message
+        raise RuntimeError(str(e)) from None
+    
+    return _info_to_dict(info) if info else None
+
 class YouTubeService:
     """Service for YouTube operations"""
     
     def __init__(self):
         """Initialize YouTube service"""
-        self.ytdl_opts = Config.YTDL_OPTIONS.copy()
-        self.ytdl = yt_dlp.YoutubeDL(self.ytdl_opts)
+        # Warm YoutubeDL instances, one set per kind of call
+        self.ytdl_pool = YoutubeDLPool({
+            'search': {
+                'quiet': True,
+                'no_warnings': True,
+                'extract_flat': True
+            },
+            'info': INFO_OPTIONS,
+            'playlist': {
+                'quiet': True,
+                'no_warnings': True,
+                'extract_flat': 'in_playlist',
+                'playlistend': Config.PLAYLIST_MAX_ENTRIES
+            },
+            'download': {
+                'format': 'bestaudio[ext=m4a]/bestaudio/best',
+                # Relative to the per-download work directory
+                'outtmpl': '%(id)s.%(format_id)s.%(ext)s',
+                'restrictfilenames': True,
+                'noplaylist': True,
+                'quiet': True,
+                'no_warnings': True,
+            }
+        }, max_idle=Config.YTDL_POOL_SIZE)
+        self.ytdl_pool.warm()
+        
+        # Separate pools so downloads can't starve searches
+        self.executors = Executors()
+        
+        # Search results keyed by normalized query and search options
+        self.search_cache = TTLCache(
+            max_entries=Config.SEARCH_CACHE_SIZE,
+            ttl=Config.SEARCH_CACHE_TTL,
+            max_bytes=Config.SEARCH_CACHE_MAX_BYTES
+        )
+        self._search_flights = SingleFlight()
+        
+        # Video info survives restarts so repeat lookups skip yt-dlp
+        self.metadata_store = MetadataStore(
+            Config.STATE_DB_PATH,
+            max_age=Config.METADATA_MAX_AGE,
+            memory_size=Config.METADATA_MEMORY_SIZE
+        )
         
         # Ensure temp directory exists
         os.makedirs(Config.TEMP_DIR, exist_ok=True)
+        
+        # Downloaded audio is kept and shared between chats
+        self.audio_cache = AudioCache(
+            Config.AUDIO_CACHE_DIR,
+            max_bytes=Config.AUDIO_CACHE_MAX_BYTES
+        )
+        
+        # Caps concurrent yt-dlp downloads across all chats
+        self.download_scheduler = DownloadScheduler(Config.MAX_CONCURRENT_DOWNLOADS)
+        self._download_flights = SingleFlight()
+        self._download_waiters: Dict[tuple, int] = {}
+        
+        # Bytes the size-aware format selection saved over bestaudio[ext=m4a]
+        self._format_lock = threading.Lock()
+        self.format_selections = 0
+        self.bytes_saved = 0
     
-    async def search_videos(self, query: str, max_results: int = 5) -> List[Dict]:
-        """Search for videos on YouTube"""
+    async def search_videos(self, query: str, max_results: int = 5,
+                            enrich: Optional[bool] = None,
+                            max_duration: Optional[int] = None) -> List[Dict]:
+        """Search for videos on YouTube
+        
+        Args:
+            query: Search query
+            max_results: Number of search entries to request
+            enrich: Run a full extraction per entry. Defaults to
+                not Config.SEARCH_FLAT_FIRST
+            max_duration: Drop entries longer than this (in seconds)
+                before any full extraction happens
+        """
+        if enrich is None:
+            enrich = not Config.SEARCH_FLAT_FIRST
+        
+        cache_key = (normalize_query(query), max_results, enrich, max_duration)
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         try:
-            # Run in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(
-                None, 
-                self._search_videos_sync, 
-                query, 
-                max_results
+            results = await self._search_flights.do(
+                cache_key,
+                lambda: self._search_and_cache(
+                    cache_key, query, max_results, enrich, max_duration
+                )
             )
-            return results
+            return list(results)
         except Exception as e:
             logger.error(f"Error searching videos: {e}")
             return []
     
-    def _search_videos_sync(self, query: str, max_results: int) -> List[Dict]:
-        """Synchronous video search"""
-        search_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': True
-        }
+    async def _search_and_cache(self, cache_key: tuple, query: str,
+                                max_results: int, enrich: bool,
+                                max_duration: Optional[int]) -> List[Dict]:
+        """Run a search in the executor and cache non-empty results"""
+        # Run in executor to avoid blocking
+        results = await self.executors.search.run(
+            self._search_videos_sync, 
+            query, 
+            max_results,
+            enrich,
+            max_duration
+        )
         
+        # Empty lists are also what errors return, so they aren't cached
+        if results:
+            self.search_cache.set(cache_key, results)
+        return results
+    
+    def executor_stats(self) -> Dict:
+        """Get load counters for the worker pools"""
+        return self.executors.stats()
+    
+    def search_cache_stats(self) -> Dict:
+        """Get search cache counters"""
+        stats = self.search_cache.stats()
+        stats['coalesced'] = self._search_flights.coalesced
+        return stats
+    
+    def _search_videos_sync(self, query: str, max_results: int,
+                            enrich: bool = True,
+                            max_duration: Optional[int] = None) -> List[Dict]:
+        """Synchronous video search"""
         try:
-            with yt_dlp.YoutubeDL(search_opts) as ytdl:
+            with self.ytdl_pool.checkout('search') as ytdl:
                 # Use proper YouTube search format
                 search_query = f"ytsearch{max_results}:{query}"
                 search_results = ytdl.extract_info(search_query, download=False)
@@ -57,13 +206,25 @@ class YouTubeService:
                     logger.error(f"No search results for query: {query}")
                     return []
                 
-                videos = []
-                for entry in search_results['entries']:
-                    if entry and entry.get('id'):
-                        # Get additional info for each video
-                        video_info = self._get_video_info_sync(entry['id'])
-                        if video_info:
-                            videos.append(video_info)
+                entries = [
+                    self._flat_entry_to_info(entry)
+                    for entry in search_results['entries']
+                    if entry and entry.get('id')
+                ]
+                
+                # Flat durations are enough to reject over-long tracks early
+                if max_duration is not None:
+                    entries = [
+                        entry for entry in entries
+                        if entry['duration'] <= max_duration
+                    ]
+                
+                if enrich:
+                    videos = self._enrich_entries_sync(
+                        [entry['id'] for entry in entries]
+                    )
+                else:
+                    videos = entries
                 
                 logger.info(f"Found {len(videos)} videos for query: {query}")
                 return videos
@@ -72,99 +233,389 @@ class YouTubeService:
             logger.error(f"Error in sync search: {e}")
             return []
     
+    @staticmethod
+    def _flat_entry_to_info(entry: Dict) -> Dict:
+        """Build the video info dict from a flat search entry
+        
+        Mirrors the shape returned by _get_video_info_sync so callers
+        can't tell flat and fully extracted results apart.
+        """
+        thumbnails = entry.get('thumbnails') or []
+        thumbnail = thumbnails[-1].get('url', '') if thumbnails else ''
+        
+        return {
+            'id': entry['id'],
+            'title': entry.get('title') or 'Unknown',
+            'duration': int(entry.get('duration') or 0),
+            'uploader': entry.get('uploader') or entry.get('channel') or 'Unknown',
+            'view_count': entry.get('view_count') or 0,
+            'url': f"https://youtube.com/watch?v={entry['id']}",
+            'thumbnail': thumbnail
+        }
+    
+    def _enrich_entries_sync(self, video_ids: List[str]) -> List[Dict]:
+        """Fetch full info for search entries concurrently
+        
+        Entries that fail or are still running after
+        Config.SEARCH_ENRICH_TIMEOUT are dropped, so a slow video only
+        shortens the result list instead of delaying it. Order follows
+        the original search ranking.
+        """
+        futures = [
+            self.executors.metadata.submit(self._get_video_info_sync, video_id)
+            for video_id in video_ids
+        ]
+        done, not_done = wait(futures, timeout=Config.SEARCH_ENRICH_TIMEOUT)
+        
+        if not_done:
+            logger.warning(
+                f"{len(not_done)} of {len(futures)} search entries timed out"
+            )
+            for future in not_done:
+                future.cancel()
+        
+        videos = []
+        for future in futures:
+            if future in done and not future.cancelled():
+                video_info = future.result()
+                if video_info:
+                    videos.append(video_info)
+        return videos
+    
+    async def get_playlist_entries(self, url: str) -> List[Dict]:
+        """List the videos of a playlist from one flat extraction
+        
+        Entries carry what the playlist page shows (ID, title, duration,
+        channel) without a per-video extraction; use get_video_info to
+        resolve them fully.
+        
+        Args:
+            url: Playlist URL
+        
+        Returns:
+            At most Config.PLAYLIST_MAX_ENTRIES video info dicts in
+            playlist order, or an empty list on error
+        """
+        try:
+            return await self.executors.search.run(self._get_playlist_entries_sync, url)
+        except Exception as e:
+            logger.error(f"Error listing playlist: {e}")
+            return []
+    
+    def _get_playlist_entries_sync(self, url: str) -> List[Dict]:
+        """Synchronous flat playlist extraction"""
+        with self.ytdl_pool.checkout('playlist') as ytdl:
+            playlist = ytdl.extract_info(url, download=False)
+        
+        if not playlist or 'entries' not in playlist:
+            logger.error(f"No playlist entries for: {url}")
+            return []
+        
+        entries = [
+            self._flat_entry_to_info(entry)
+            for entry in playlist['entries']
+            if entry and entry.get('id')
+        ]
+        logger.info(f"Found {len(entries)} videos in playlist: {playlist.get('title', url)}")
+        return entries
+    
     async def get_video_info(self, url: str) -> Optional[Dict]:
         """Get information about a YouTube video"""
+        # Answer from the metadata store without leaving the event loop
+        video_id = self._video_id_from(url)
+        if video_id:
+            cached = self.metadata_store.get(video_id)
+            if cached:
+                return cached
+        
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, 
-                self._get_video_info_sync, 
-                url
-            )
-            return result
+            return await self.executors.metadata.run(self._get_video_info_sync, url)
         except Exception as e:
             logger.error(f"Error getting video info: {e}")
             return None
     
+    @staticmethod
+    def _video_id_from(url_or_id: str) -> Optional[str]:
+        """Get the video ID from a URL or bare ID"""
+        if not url_or_id.startswith('http'):
+            return url_or_id
+        return extract_video_id(url_or_id)
+    
     def _get_video_info_sync(self, url_or_id: str) -> Optional[Dict]:
         """Synchronous video info extraction"""
+        video_id = self._video_id_from(url_or_id)
+        if video_id:
+            cached = self.metadata_store.get(video_id)
+            if cached:
+                return cached
+        
         try:
             # Handle both URLs and video IDs
             if not url_or_id.startswith('http'):
                 url_or_id = f"https://youtube.com/watch?v={url_or_id}"
             
-            info_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False
-            }
+            if self.executors.extract:
+                video_info = self.executors.extract.submit(
+                    extract_video_info, url_or_id
+                ).result()
+            else:
+                with self.ytdl_pool.checkout('info') as ytdl:
+                    info = ytdl.extract_info(url_or_id, download=False)
+                    video_info = _info_to_dict(info) if info else None
             
-            with yt_dlp.YoutubeDL(info_opts) as ytdl:
-                info = ytdl.extract_info(url_or_id, download=False)
-                
-                if not info:
-                    return None
-                
-                return {
-                    'id': info.get('id', ''),
-                    'title': info.get('title', 'Unknown'),
-                    'duration': info.get('duration', 0),
-                    'uploader': info.get('uploader', 'Unknown'),
-                    'view_count': info.get('view_count', 0),
-                    'url': info.get('webpage_url', ''),
-                    'thumbnail': info.get('thumbnail', '')
-                }
+            if not video_info:
+                return None
+            
+            if video_info['id']:
+                self.metadata_store.put(video_info['id'], video_info)
+            return video_info
                 
         except Exception as e:
             logger.error(f"Error getting video info sync: {e}")
             return None
     
-    async def download_audio(self, video_id: str) -> Optional[str]:
-        """Download audio from YouTube video"""
+    async def download_audio(self, video_id: str, chat_id: Optional[int] = None,
+                             priority: int = PRIORITY_INTERACTIVE,
+                             on_position: Optional[PositionCallback] = None,
+                             quality: str = DEFAULT_QUALITY) -> Optional[str]:
+        """Download audio from YouTube video
+        
+        Serves the file from the audio cache when possible, otherwise
+        waits for a download scheduler slot. The returned path is pinned
+        in the cache; pass it to release_audio() once the file has been
+        sent.
+        
+        Args:
+            video_id: YouTube video ID
+            chat_id: Chat the download is for, used for fair scheduling
+            priority: Download scheduler priority
+            on_position: Called with the queue position while waiting
+            quality: Quality tier used to pick the audio format
+        """
+        cached_path = self.audio_cache.acquire(video_id, quality)
+        if cached_path:
+            logger.info(f"Audio cache hit: {cached_path}")
+            return cached_path
+        
+        # Concurrent requests for the same video share one download; each
+        # waiter gets its own pin on the resulting file
+        key = (video_id, quality)
+        self._download_waiters[key] = self._download_waiters.get(key, 0) + 1
+        
+        # Joining a queued prefetch must not leave an interactive caller
+        # waiting at prefetch priority
+        if key in self._download_flights:
+            self.download_scheduler.promote(key, priority, on_position)
+        
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, 
-                self._download_audio_sync, 
-                video_id
+            return await self._download_flights.do(
+                key,
+                lambda: self.download_scheduler.submit(
+                    lambda: self._download_to_cache(video_id, quality),
+                    chat_id=chat_id,
+                    priority=priority,
+                    on_position=on_position,
+                    key=key
+                )
             )
-            return result
+        except asyncio.CancelledError:
+            if key in self._download_waiters:
+                self._release_waiter(key)
+            else:
+                # The download finished and already pinned the file for us
+                path = self.audio_cache.path_for(video_id, quality)
+                if path:
+                    self.audio_cache.release(path)
+            raise
         except Exception as e:
             logger.error(f"Error downloading audio: {e}")
             return None
     
-    def _download_audio_sync(self, video_id: str) -> Optional[str]:
-        """Synchronous audio download"""
+    def _release_waiter(self, key: tuple):
+        """Drop a waiter that left before its download finished"""
+        self._download_waiters[key] -= 1
+        if self._download_waiters[key] <= 0:
+            del self._download_waiters[key]
+    
+    async def _download_to_cache(self, video_id: str, quality: str) -> Optional[str]:
+        """Download a video's audio and move it into the audio cache"""
+        key = (video_id, quality)
+        
+        # Tiers can pick the same format, so downloads of one video for two
+        # tiers would otherwise write the same .part file
+        work_dir = tempfile.mkdtemp(prefix=f"{video_id}.", dir=Config.TEMP_DIR)
         try:
-            url = f"https://youtube.com/watch?v={video_id}"
+            try:
+                result = await self.executors.download.run(
+                    self._download_audio_sync,
+                    video_id,
+                    quality,
+                    work_dir
+                )
+            finally:
+                waiters = self._download_waiters.pop(key, 0)
             
-            # Configure download options - download best audio directly
-            download_opts = {
-                'format': 'bestaudio[ext=m4a]/bestaudio/best',
-                'outtmpl': os.path.join(Config.TEMP_DIR, f'{video_id}.%(ext)s'),
-                'restrictfilenames': True,
-                'noplaylist': True,
-                'quiet': True,
-                'no_warnings': True,
+            if not result:
+                return None
+            
+            # One pin per waiter, so the file stays until the last one has sent it
+            return self.audio_cache.add(video_id, quality, result, readers=waiters)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    async def open_audio_stream(self, video_id: str, chat_id: Optional[int] = None,
+                                priority: int = PRIORITY_INTERACTIVE,
+                                on_position: Optional[PositionCallback] = None,
+                                quality: str = DEFAULT_QUALITY) -> Optional[Tuple]:
+        """Fetch audio into an in-memory spool instead of the temp directory
+        
+        Takes a download scheduler slot like download_audio. Nothing is
+        added to the audio cache.
+        
+        Returns:
+            (spool, ext) tuple, or None if the audio can't be streamed.
+            The caller must close the spool.
+        """
+        async def fetch():
+            stream_info = await self.executors.metadata.run(
+                self._resolve_stream_sync, video_id, quality
+            )
+            if not stream_info:
+                return None
+            
+            spool = await spool_audio(
+                stream_info['url'],
+                headers=stream_info['http_headers'],
+                max_memory=Config.STREAM_SPOOL_MAX_BYTES,
+                max_bytes=Config.MAX_UPLOAD_BYTES
+            )
+            return spool, stream_info['ext']
+        
+        try:
+            return await self.download_scheduler.submit(
+                fetch,
+                chat_id=chat_id,
+                priority=priority,
+                on_position=on_position
+            )
+        except Exception as e:
+            logger.error(f"Error streaming audio: {e}")
+            return None
+    
+    def _resolve_stream_sync(self, video_id: str, quality: str) -> Optional[Dict]:
+        """Resolve the direct media URL of the format picked for a tier"""
+        try:
+            with self.ytdl_pool.checkout('download') as ytdl:
+                ie_result, fmt = self._select_format_sync(ytdl, video_id, quality)
+            
+            # Fragmented formats can't be piped as one request
+            if not fmt or not fmt.get('url') or determine_protocol(fmt) not in ('http', 'https'):
+                return None
+            
+            return {
+                'url': fmt['url'],
+                'http_headers': fmt.get('http_headers') or ie_result.get('http_headers') or {},
+                'ext': fmt.get('ext') or 'm4a'
             }
             
-            with yt_dlp.YoutubeDL(download_opts) as ytdl:
-                ytdl.download([url])
-                
-                # Find the downloaded file (any audio format)
-                for file in os.listdir(Config.TEMP_DIR):
-                    if video_id in file and any(file.endswith(ext) for ext in ['.m4a', '.webm', '.mp3', '.aac']):
-                        file_path = os.path.join(Config.TEMP_DIR, file)
-                        logger.info(f"Downloaded audio: {file_path}")
-                        return file_path
+        except Exception as e:
+            logger.error(f"Error resolving stream URL: {e}")
+            return None
+    
+    def release_audio(self, path: str):
+        """Let the audio cache evict a file returned by download_audio"""
+        self.audio_cache.release(path)
+    
+    def _download_audio_sync(self, video_id: str, quality: str = DEFAULT_QUALITY,
+                             work_dir: str = Config.TEMP_DIR) -> Optional[str]:
+        """Synchronous audio download into work_dir"""
+        try:
+            with self.ytdl_pool.checkout('download') as ytdl:
+                ie_result, fmt = self._select_format_sync(ytdl, video_id, quality)
+                if not fmt:
+                    return None
                 
+                # Download exactly the picked format into this download's
+                # own directory, then put the pooled instance's settings back
+                default_selector = ytdl.format_selector
+                default_paths = ytdl.params.get('paths', {})
+                ytdl.format_selector = ytdl.build_format_selector(fmt['format_id'])
+                ytdl.params['paths'] = {'home': work_dir}
+                try:
+                    info = ytdl.process_ie_result(ie_result, download=True)
+                finally:
+                    ytdl.format_selector = default_selector
+                    ytdl.params['paths'] = default_paths
+            
+            # yt-dlp reports where it wrote the file, so there's no need
+            # to look through the temp directory for it
+            file_path = self._downloaded_path(info)
+            if not file_path or not os.path.isfile(file_path):
                 logger.error(f"No audio file found for video ID: {video_id}")
                 return None
+            
+            logger.info(f"Downloaded audio: {file_path}")
+            return file_path
                 
         except Exception as e:
             logger.error(f"Error in sync download: {e}")
             return None
     
+    def _select_format_sync(self, ytdl, video_id: str, quality: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Extract a video's formats and pick the smallest fitting one
+        
+        Returns:
+            (unprocessed extraction result, chosen format) tuple. The
+            format is None when nothing fits under Config.MAX_UPLOAD_BYTES.
+        """
+        url = f"https://youtube.com/watch?v={video_id}"
+        ie_result = ytdl.extract_info(url, download=False, process=False)
+        if not ie_result:
+            return None, None
+        
+        formats = ie_result.get('formats') or []
+        duration = ie_result.get('duration')
+        fmt = select_audio_format(formats, duration, quality, Config.MAX_UPLOAD_BYTES)
+        
+        if not fmt:
+            logger.warning(f"No audio format of {video_id} fits the upload limit")
+            return ie_result, None
+        
+        size = estimate_size(fmt, duration) or 0
+        baseline = baseline_format(formats)
+        saved = (estimate_size(baseline, duration) or size) - size if baseline else 0
+        
+        with self._format_lock:
+            self.format_selections += 1
+            self.bytes_saved += saved
+        
+        logger.info(
+            f"Picked format {fmt['format_id']} for {video_id} ({quality}): "
+            f"{fmt.get('abr') or 0:.0f} kbps, ~{size} bytes, "
+            f"{saved} bytes saved vs bestaudio[ext=m4a]"
+        )
+        return ie_result, fmt
+    
+    def format_stats(self) -> Dict:
+        """Get format selection counters"""
+        with self._format_lock:
+            return {
+                'selections': self.format_selections,
+                'bytes_saved': self.bytes_saved
+            }
+    
+    @staticmethod
+    def _downloaded_path(info: Optional[Dict]) -> Optional[str]:
+        """Final file path from yt-dlp's post-download info"""
+        if not info:
+            return None
+        
+        for download in info.get('requested_downloads') or []:
+            if download.get('filepath'):
+                return download['filepath']
+        
+        return info.get('filepath') or info.get('_filename')
+    
     def cleanup_temp_files(self):
         """Clean up temporary files"""
         try:
@@ -172,5 +623,7 @@ class YouTubeService:
                 file_path = os.path.join(Config.TEMP_DIR, file)
                 if os.path.isfile(file_path):
                     os.remove(file_path)
+                elif os.path.isdir(file_path):
+                    shutil.rmtree(file_path, ignore_errors=True)
         except Exception as e:
             logger.error(f"Error cleaning up temp files: {e}")
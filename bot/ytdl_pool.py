@@ -0,0 +1,94 @@
+"""
+YoutubeDL Pool
+Reusable yt-dlp instances, one set per option profile
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+import yt_dlp
+
+logger = logging.getLogger(__name__)
+
+class YoutubeDLPool:
+    """Thread-safe pool of warm YoutubeDL objects
+    
+    Building a YoutubeDL sets up every extractor, the cookie jar and the
+    HTTP handlers, which costs far more than the metadata lookups it is
+    often used for. Instances are checked out for a single call and then
+    returned, so each one is only used by one thread at a time.
+    """
+    
+    def __init__(self, profiles: Dict[str, Dict], max_idle: int):
+        """Initialize pool
+        
+        Args:
+            profiles: Option dicts keyed by profile name
+            max_idle: Idle instances kept per profile
+        """
+        self.profiles = profiles
+        self.max_idle = max_idle
+        
+        self._lock = threading.Lock()
+        self._idle: Dict[str, List[yt_dlp.YoutubeDL]] = {name: [] for name in profiles}
+        
+        self.created = 0
+        self.reused = 0
+    
+    def warm(self, count: int = 1):
+        """Build instances ahead of time so first calls don't pay for it"""
+        for name in self.profiles:
+            instances = [self._create(name) for _ in range(min(count, self.max_idle))]
+            with self._lock:
+                self._idle[name].extend(instances)
+    
+    @contextmanager
+    def checkout(self, profile: str) -> Iterator[yt_dlp.YoutubeDL]:
+        """Borrow an instance for the given profile"""
+        with self._lock:
+            idle = self._idle[profile]
+            ytdl = idle.pop() if idle else None
+            if ytdl is not None:
+                self.reused += 1
+        
+        if ytdl is None:
+            ytdl = self._create(profile)
+        
+        try:
+            yield ytdl
+        finally:
+            self._checkin(profile, ytdl)
+    
+    def _create(self, profile: str) -> yt_dlp.YoutubeDL:
+        with self._lock:
+            self.created += 1
+        return yt_dlp.YoutubeDL(dict(self.profiles[profile]))
+    
+    def _checkin(self, profile: str, ytdl: yt_dlp.YoutubeDL):
+        with self._lock:
+            idle = self._idle[profile]
+            if len(idle) < self.max_idle:
+                idle.append(ytdl)
+                return
+        
+        ytdl.close()
+    
+    def close(self):
+        """Close every idle instance"""
+        with self._lock:
+            instances = [ytdl for idle in self._idle.values() for ytdl in idle]
+            for idle in self._idle.values():
+                idle.clear()
+        
+        for ytdl in instances:
+            ytdl.close()
+    
+    def stats(self) -> Dict:
+        """Get pool counters"""
+        with self._lock:
+            return {
+                'created': self.created,
+                'reused': self.reused,
+                'idle': {name: len(idle) for name, idle in self._idle.items()}
+            }
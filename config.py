@@ -15,16 +15,70 @@ class Config:
     AUDIO_QUALITY = 'bestaudio/best'
     MAX_DURATION = 600  # 10 minutes in seconds
     AUDIO_FORMAT = 'mp3'
+    CHAT_SETTINGS_MEMORY_SIZE = 5000  # Chats whose quality tier is kept in memory
+    
+    # Update handling
+    MAX_CONCURRENT_UPDATES = 256  # Across all chats; one at a time per chat
+    MAX_PENDING_UPDATES_PER_CHAT = 20  # Waiting behind a chat's running update
     
     # Queue settings
     MAX_QUEUE_SIZE = 50
+    RADIO_MAX_QUEUE_SIZE = 2000  # For long-running radio-style chats
+    RADIO_CHAT_IDS = {
+        int(chat_id) for chat_id in os.getenv('RADIO_CHAT_IDS', '').split(',') if chat_id.strip()
+    }
+    QUEUE_DISPLAY_LIMIT = 20  # Songs listed by /queue
+    PLAYLIST_MAX_ENTRIES = 200  # Entries read from one playlist URL
+    PLAYLIST_RESOLVE_CONCURRENCY = 4  # Background metadata lookups per playlist
+    BATCH_DOWNLOAD_LIMIT = 50  # Songs sent by one "Download all" press
+    QUEUE_FLUSH_INTERVAL = 1.0  # Seconds queue changes are batched before saving
+    MAX_RESIDENT_QUEUES = 5000  # Chat queues kept in memory
+    QUEUE_IDLE_TIMEOUT = 3600  # Seconds before an unused chat queue is spilled
     MAX_CONCURRENT_DOWNLOADS = 3
+    YTDL_POOL_SIZE = 4  # Idle YoutubeDL instances kept per option profile
+    
+    # Streaming uploads
+    STREAMING_UPLOAD = False  # Pipe audio into the upload without a temp file
+    STREAM_SPOOL_MAX_BYTES = 32 * 1024 * 1024  # Kept in memory before spilling
+    MAX_UPLOAD_BYTES = 50 * 1024 * 1024  # Telegram Bot API upload limit
+    
+    # Queue prefetching
+    PREFETCH_LOOKAHEAD = 2  # Songs after the current one kept downloaded
+    PREFETCH_MAX_BYTES = 128 * 1024 * 1024  # 128 MB pinned by prefetches
+    
+    # Worker pools
+    SEARCH_WORKERS = 4
+    METADATA_WORKERS = 8  # Also bounds concurrent search enrichment
+    DOWNLOAD_WORKERS = MAX_CONCURRENT_DOWNLOADS
+    EXTRACT_IN_PROCESS = False  # Run full extraction in a process pool
+    EXTRACT_PROCESSES = 2
+    
+    # Search settings
+    SEARCH_FLAT_FIRST = True  # Render /search from flat entries, extract on pick
+    SEARCH_ENRICH_TIMEOUT = 8  # Seconds before returning partial results
+    SEARCH_CACHE_SIZE = 1000  # Cached result lists
+    SEARCH_CACHE_TTL = 3600  # 1 hour in seconds
+    SEARCH_CACHE_MAX_BYTES = 16 * 1024 * 1024  # 16 MB
+    SEARCH_RESULTS_STORE_SIZE = 5000  # Result keyboards whose entries are kept
+    SEARCH_RESULTS_TTL = 1800  # 30 minutes in seconds
     
     # Rate limiting
     MAX_REQUESTS_PER_MINUTE = 10
+    STATUS_EDIT_INTERVAL = 1.0  # Seconds between status edits in a private chat
+    GROUP_STATUS_EDIT_INTERVAL = 3.0  # Groups allow about 20 messages a minute
+    BOT_API_REQUESTS_PER_SECOND = 30  # Outgoing requests across all chats
+    GROUP_MESSAGES_PER_MINUTE = 20  # Outgoing messages per group chat
+    
+    # Metadata cache
+    METADATA_MAX_AGE = 7 * 24 * 3600  # 7 days in seconds
+    METADATA_MEMORY_SIZE = 2000  # Entries kept in memory
     
     # File paths
     TEMP_DIR = './temp'
+    DATA_DIR = './data'
+    STATE_DB_PATH = f'{DATA_DIR}/melody.db'
+    AUDIO_CACHE_DIR = f'{DATA_DIR}/audio'
+    AUDIO_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
     LOG_FILE = 'bot.log'
     
     # YouTube DL options
@@ -57,6 +111,7 @@ Available commands:
 /queue - Show current queue
 /skip - Skip current song
 /stop - Stop playback and clear queue
+/quality - Choose audio quality
 
 Just send me a song name or YouTube URL and I'll find it for you!
     """
@@ -71,17 +126,20 @@ Commands:
 • /queue - View current queue
 • /skip - Skip current song
 • /stop - Stop playback and clear queue
+• /quality <low|standard|high> - Choose audio quality
 
 Examples:
 • /search Bohemian Rhapsody
 • /play Never Gonna Give You Up
+• /play <playlist URL> - Queue a whole playlist
 • /download Shape of You
 • Send me a YouTube URL directly
 
 Features:
 ✅ Voice chat streaming support
 ✅ High-quality MP3 downloads
-✅ Queue management
+✅ Queue management and playlists
+✅ "Download all" sends playlists and search results as albums
 ✅ Works in groups and private chats
 ✅ Supports YouTube URLs and search queries
 
@@ -9,10 +9,12 @@ import asyncio
 import os
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters
 from bot.handlers import (
-    start_handler, help_handler, search_handler, play_handler, download_handler,
-    queue_handler, skip_handler, stop_handler, button_callback_handler,
-    error_handler
+    admit_update, reject_busy_update, start_handler, help_handler, search_handler, play_handler, download_handler,
+    queue_handler, skip_handler, stop_handler, quality_handler, button_callback_handler,
+    error_handler, shutdown_handler
 )
+from bot.chat_actor import ChatUpdateProcessor
+from bot.rate_limiter import OutboundRateLimiter
 from config import Config
 
 # Configure logging
@@ -34,8 +36,26 @@ def main():
         logger.error("TELEGRAM_BOT_TOKEN environment variable not set!")
         return
     
-    # Create application
-    application = Application.builder().token(bot_token).build()
+    # Create application: outgoing requests stay within Telegram's limits and
+    # updates run concurrently across chats but in order within each chat
+    rate_limiter = OutboundRateLimiter(
+        overall_rate=Config.BOT_API_REQUESTS_PER_SECOND,
+        group_per_minute=Config.GROUP_MESSAGES_PER_MINUTE
+    )
+    application = (
+        Application.builder()
+        .token(bot_token)
+        .rate_limiter(rate_limiter)
+        .concurrent_updates(ChatUpdateProcessor(
+            Config.MAX_CONCURRENT_UPDATES,
+            Config.MAX_PENDING_UPDATES_PER_CHAT,
+            # Users over their request limit are turned away before queueing
+            admit=admit_update,
+            on_overflow=reject_busy_update
+        ))
+        .post_shutdown(shutdown_handler)
+        .build()
+    )
     
     # Add command handlers
     application.add_handler(CommandHandler("start", start_handler))
@@ -46,6 +66,7 @@ def main():
     application.add_handler(CommandHandler("queue", queue_handler))
     application.add_handler(CommandHandler("skip", skip_handler))
     application.add_handler(CommandHandler("stop", stop_handler))
+    application.add_handler(CommandHandler("quality", quality_handler))
     
     # Add callback query handler for inline keyboards
     application.add_handler(CallbackQueryHandler(button_callback_handler))
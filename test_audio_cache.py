@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test that downloads move into the audio cache from another filesystem
+"""
+
+import errno
+import os
+import tempfile
+from bot.audio_cache import AudioCache
+
+def test_cross_device_add():
+    """Renames across directories fail like they do across mounts"""
+    rename, replace = os.rename, os.replace
+    
+    def cross_device(move):
+        def checked_move(src, dst):
+            if os.path.dirname(os.path.abspath(src)) != os.path.dirname(os.path.abspath(dst)):
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            move(src, dst)
+        return checked_move
+    
+    with tempfile.TemporaryDirectory() as directory:
+        download = os.path.join(directory, 'abc.140.m4a')
+        with open(download, 'wb') as f:
+            f.write(b"audio")
+        
+        cache = AudioCache(os.path.join(directory, 'cache'), max_bytes=10 ** 6)
+        os.rename, os.replace = cross_device(rename), cross_device(replace)
+        try:
+            path = cache.add('abc', 'standard', download)
+        finally:
+            os.rename, os.replace = rename, replace
+        
+        assert not os.path.exists(download)
+        assert not os.path.exists(f"{path}.part")
+        with open(path, 'rb') as f:
+            assert f.read() == b"audio"
+        assert cache.acquire('abc', 'standard') == path
+        
+        # A restart indexes the moved file
+        assert AudioCache(cache.cache_dir, max_bytes=10 ** 6).contains('abc', 'standard')
+
+if __name__ == '__main__':
+    test_cross_device_add()
+    print("Audio cache test PASSED")
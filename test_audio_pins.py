@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test that shared downloads pin the cached file once per caller, including
+callers that are cancelled
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+from bot.download_scheduler import DownloadScheduler
+from bot.youtube_service import YouTubeService
+from config import Config
+
+QUALITY = 'standard'
+
+class StandInDownloads:
+    """Replaces the yt-dlp step with files that finish on demand"""
+    
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = 0
+        self.work_dirs = []
+    
+    def __call__(self, video_id, quality, work_dir):
+        self.calls += 1
+        self.work_dirs.append(work_dir)
+        self.gate.wait(5)
+        path = os.path.join(work_dir, f"{video_id}.download.m4a")
+        with open(path, 'wb') as f:
+            f.write(b"a" * 1000)
+        return path
+
+def state_in(directory):
+    """Keep the service's database, cache and work files in a test directory"""
+    return patch.multiple(
+        Config,
+        TEMP_DIR=os.path.join(directory, 'temp'),
+        STATE_DB_PATH=os.path.join(directory, 'melody.db'),
+        AUDIO_CACHE_DIR=os.path.join(directory, 'cache'),
+        AUDIO_CACHE_MAX_BYTES=10 ** 9
+    )
+
+def make_service():
+    """A YouTubeService whose downloads write local stand-in files"""
+    service = YouTubeService()
+    service.download_scheduler = DownloadScheduler(2)
+    downloads = StandInDownloads()
+    service._download_audio_sync = downloads
+    return service, downloads
+
+def readers(service, video_id):
+    entry = service.audio_cache._entries.get(service.audio_cache.make_key(video_id, QUALITY))
+    return entry.readers if entry else None
+
+async def run_shared_pins():
+    """Five callers share one download and each release one pin"""
+    service, downloads = make_service()
+    callers = [
+        asyncio.ensure_future(service.download_audio('shared', chat_id=n, quality=QUALITY))
+        for n in range(5)
+    ]
+    await asyncio.sleep(0.05)
+    downloads.gate.set()
+    paths = await asyncio.gather(*callers)
+    
+    pinned = readers(service, 'shared')
+    service.audio_cache.max_bytes = 0  # Evict as soon as nothing pins the file
+    for path in paths[:4]:
+        service.release_audio(path)
+    kept = os.path.exists(paths[0])
+    service.release_audio(paths[4])
+    
+    print(f"Downloads: {downloads.calls}, pins: {pinned}, kept with one pin: {kept}")
+    assert downloads.calls == 1
+    assert len(set(paths)) == 1
+    assert pinned == 5
+    assert kept
+    assert not os.path.exists(paths[0])
+
+async def run_cancel_before():
+    """A caller cancelled while waiting takes no pin; its peer still does"""
+    service, downloads = make_service()
+    leaving = asyncio.ensure_future(service.download_audio('early', chat_id=1, quality=QUALITY))
+    staying = asyncio.ensure_future(service.download_audio('early', chat_id=2, quality=QUALITY))
+    await asyncio.sleep(0.05)
+    
+    leaving.cancel()
+    await asyncio.sleep(0)
+    downloads.gate.set()
+    path = await staying
+    pinned = readers(service, 'early')
+    
+    service.release_audio(path)
+    print(f"Pins after an early cancel: {pinned}, waiters left: {service._download_waiters}")
+    assert pinned == 1
+    assert readers(service, 'early') == 0
+    assert not service._download_waiters
+
+async def run_cancel_after():
+    """A caller cancelled once the file is cached gives its pin back"""
+    service, downloads = make_service()
+    staying = asyncio.ensure_future(service.download_audio('late', chat_id=1, quality=QUALITY))
+    leaving = asyncio.ensure_future(service.download_audio('late', chat_id=2, quality=QUALITY))
+    await asyncio.sleep(0.05)
+    
+    # Cancel right after the download finished, before the caller resumes
+    flight = service._download_flights._inflight[('late', QUALITY)]
+    flight.add_done_callback(lambda _: leaving.cancel())
+    downloads.gate.set()
+    
+    path = await staying
+    try:
+        await leaving
+        cancelled = False
+    except asyncio.CancelledError:
+        cancelled = True
+    pinned = readers(service, 'late')
+    
+    service.release_audio(path)
+    print(f"Late cancel took effect: {cancelled}, pins left for the other caller: {pinned}")
+    assert cancelled
+    assert pinned == 1
+    assert readers(service, 'late') == 0
+
+async def run_tiers_apart():
+    """Two tiers of one video download into separate work directories"""
+    service, downloads = make_service()
+    callers = [
+        asyncio.ensure_future(service.download_audio('tiers', chat_id=n, quality=quality))
+        for n, quality in enumerate(('standard', 'high'))
+    ]
+    await asyncio.sleep(0.05)
+    downloads.gate.set()
+    paths = await asyncio.gather(*callers)
+    for path in paths:
+        service.release_audio(path)
+    
+    print(f"Work directories: {downloads.work_dirs}, cached: {paths}")
+    assert downloads.calls == 2
+    assert len(set(downloads.work_dirs)) == 2
+    assert not any(os.path.exists(work_dir) for work_dir in downloads.work_dirs)
+    assert all(os.path.exists(path) for path in paths)
+
+def test_audio_pins():
+    """Test pin counting for shared and cancelled downloads"""
+    for run in (run_shared_pins, run_cancel_before, run_cancel_after, run_tiers_apart):
+        with tempfile.TemporaryDirectory() as directory, state_in(directory):
+            asyncio.run(run())
+
+if __name__ == '__main__':
+    test_audio_pins()
+    print("Audio pin test PASSED")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test open_audio_stream and the streaming upload path with a stand-in
+YoutubeDL and a local media host
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+from telegram import InputFile
+from bot import handlers
+from bot.file_id_cache import FileIdCache
+from bot.song import Song
+from bot.youtube_service import YouTubeService
+from config import Config
+
+AUDIO_BYTES = bytes(range(256)) * 4096  # 1 MB of fake audio
+
+class MediaHandler(BaseHTTPRequestHandler):
+    """Serves the audio file like a media host"""
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/mp4')
+        self.send_header('Content-Length', str(len(AUDIO_BYTES)))
+        self.end_headers()
+        self.wfile.write(AUDIO_BYTES)
+    
+    def log_message(self, format, *args):
+        pass
+
+class StandInYoutubeDL:
+    """Answers extract_info with one audio format on the local host"""
+    
+    def __init__(self, url, protocol):
+        self.url = url
+        self.protocol = protocol
+        self.filesize = len(AUDIO_BYTES)
+        self.calls = []
+    
+    def extract_info(self, url, download=True, process=True):
+        self.calls.append((url, download, process))
+        return {
+            'id': url.rsplit('=', 1)[-1],
+            'duration': 60,
+            'http_headers': {'User-Agent': 'stand-in'},
+            'formats': [{
+                'format_id': '140',
+                'ext': 'm4a',
+                'acodec': 'mp4a.40.2',
+                'vcodec': 'none',
+                'abr': 128,
+                'filesize': self.filesize,
+                'url': self.url,
+                'protocol': self.protocol
+            }]
+        }
+
+class StandInPool:
+    """Hands out one stand-in YoutubeDL for every profile"""
+    
+    def __init__(self, ytdl):
+        self.ytdl = ytdl
+    
+    @contextmanager
+    def checkout(self, profile):
+        yield self.ytdl
+
+def stand_in_download(video_id, quality, work_dir):
+    """Replaces the yt-dlp download with a local file"""
+    path = os.path.join(work_dir, f"{video_id}.140.m4a")
+    with open(path, 'wb') as f:
+        f.write(AUDIO_BYTES)
+    return path
+
+def make_service(url, protocol='http'):
+    """A YouTubeService whose extractions come from a stand-in YoutubeDL"""
+    service = YouTubeService()
+    ytdl = StandInYoutubeDL(url, protocol)
+    service.ytdl_pool = StandInPool(ytdl)
+    service._download_audio_sync = stand_in_download
+    return service, ytdl
+
+async def run_spool(url):
+    """Small tracks stay in memory and large ones roll over to a file"""
+    service, ytdl = make_service(url)
+    spools = {}
+    for name, max_memory in (('memory', 2 * len(AUDIO_BYTES)), ('rollover', 64 * 1024)):
+        with patch.object(Config, 'STREAM_SPOOL_MAX_BYTES', max_memory):
+            spool, ext = await service.open_audio_stream('dQw4w9WgXcQ', chat_id=1)
+        with spool:
+            spools[name] = (spool._rolled, spool.read(), ext)
+    
+    print(f"Rolled over: { {name: rolled for name, (rolled, _, _) in spools.items()} }")
+    assert spools['memory'][0] is False
+    assert spools['rollover'][0] is True
+    assert spools['memory'][1] == AUDIO_BYTES
+    assert spools['rollover'][1] == AUDIO_BYTES
+    assert spools['memory'][2] == 'm4a'
+    # Formats are picked from the unprocessed extraction
+    assert ytdl.calls == [('https://youtube.com/watch?v=dQw4w9WgXcQ', False, False)] * 2
+    
+    # Tracks over the upload limit aren't streamed, whether the format
+    # says so up front or the stream only turns out larger
+    with patch.object(Config, 'MAX_UPLOAD_BYTES', len(AUDIO_BYTES) // 2):
+        assert await service.open_audio_stream('dQw4w9WgXcQ', chat_id=1) is None
+        ytdl.filesize = 1000
+        assert await service.open_audio_stream('dQw4w9WgXcQ', chat_id=1) is None
+
+class RecordingBot:
+    """Stand-in for a telegram.Bot that records uploads"""
+    
+    def __init__(self):
+        self.uploads = []
+    
+    async def send_audio(self, chat_id, audio, **kwargs):
+        if isinstance(audio, InputFile):
+            self.uploads.append(('stream', audio.input_file_content))
+        else:
+            self.uploads.append(('file', audio.read()))
+        return SimpleNamespace(audio=SimpleNamespace(file_id='sent', file_size=len(AUDIO_BYTES), duration=60))
+
+class RecordingEditor:
+    def __init__(self):
+        self.texts = []
+    
+    def edit(self, message, text, **kwargs):
+        self.texts.append(text)
+
+async def run_delivery(url, protocol, video_id):
+    """Send one song through download_and_send_audio"""
+    service, ytdl = make_service(url, protocol)
+    bot = RecordingBot()
+    editor = RecordingEditor()
+    update = SimpleNamespace(effective_chat=SimpleNamespace(id=42))
+    context = SimpleNamespace(bot=bot)
+    
+    with patch.object(handlers, 'youtube_service', service), \
+            patch.object(handlers, 'status_editor', editor):
+        await handlers.download_and_send_audio(update, context, Song(video_id, 'Song', 60), object())
+    
+    print(f"{protocol}: uploads {[kind for kind, _ in bot.uploads]}, last status: {editor.texts[-1]}")
+    return bot.uploads, service.audio_cache.contains(video_id, handlers.get_chat_quality(42))
+
+def test_audio_stream():
+    """Test spooling in memory and on disk, and the fallback to a download"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MediaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/audio.m4a"
+    
+    try:
+        with tempfile.TemporaryDirectory() as directory, patch.multiple(
+            Config,
+            TEMP_DIR=os.path.join(directory, 'temp'),
+            STATE_DB_PATH=os.path.join(directory, 'melody.db'),
+            AUDIO_CACHE_DIR=os.path.join(directory, 'cache'),
+            STREAMING_UPLOAD=True
+        ), patch.object(handlers, 'file_id_cache', FileIdCache(os.path.join(directory, 'files.db'))):
+            asyncio.run(run_spool(url))
+            
+            # A direct HTTP format is piped into the upload and never cached
+            uploads, cached = asyncio.run(run_delivery(url, 'http', 'streamed001'))
+            assert uploads == [('stream', AUDIO_BYTES)]
+            assert not cached
+            
+            # A fragmented format can't be piped, so the song is downloaded
+            uploads, cached = asyncio.run(run_delivery(url, 'm3u8_native', 'fragment01'))
+            assert uploads == [('file', AUDIO_BYTES)]
+            assert cached
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    test_audio_stream()
+    print("Audio stream test PASSED")
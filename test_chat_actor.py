@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test that chat actors keep per-chat order while chats run in parallel
+"""
+
+import asyncio
+from datetime import datetime
+from telegram import Chat, Message, Update, User
+from bot.chat_actor import ChatActors, ChatUpdateProcessor, MailboxFull
+from bot.queue_manager import QueueManager
+from bot.song import Song
+
+async def run_actors(actors, queues, starts, running):
+    """Race two button presses and a /skip per chat across 50 chats"""
+    async def press(chat_id, n):
+        running['now'] += 1
+        running['peak'] = max(running['peak'], running['now'])
+        # Resolving the song yields to the loop, like the real handler
+        await asyncio.sleep(0.01)
+        running['now'] -= 1
+        position = queues[chat_id].add_song(Song(f"v{n}", f"Song {n}", 60))
+        if position == 0:
+            starts.setdefault(chat_id, []).append(n)
+    
+    async def skip(chat_id):
+        await asyncio.sleep(0)
+        return queues[chat_id].skip_song()
+    
+    return await asyncio.gather(*(
+        job
+        for chat_id in range(50)
+        for job in (
+            actors.submit(chat_id, press(chat_id, 1)),
+            actors.submit(chat_id, press(chat_id, 2)),
+            actors.submit(chat_id, skip(chat_id))
+        )
+    ))
+
+def test_chat_actor():
+    """Test per-chat ordering and cross-chat concurrency"""
+    actors = ChatActors()
+    queues = {chat_id: QueueManager(chat_id) for chat_id in range(50)}
+    starts = {}
+    running = {'now': 0, 'peak': 0}
+    results = asyncio.run(run_actors(actors, queues, starts, running))
+    
+    skipped = [song.id for song in results[2::3]]
+    current = [queue.get_current_song().id for queue in queues.values()]
+    print(f"150 updates over 50 chats, peak running {running['peak']}, stats: {actors.stats()}")
+    
+    # One playback start per chat, /skip saw both presses
+    assert all(starts[chat_id] == [1] for chat_id in range(50))
+    assert skipped == ["v1"] * 50
+    assert current == ["v2"] * 50
+    # Chats overlapped instead of running one after another
+    assert running['peak'] == 50
+    assert actors.stats()['active_chats'] == 0
+
+async def run_backlog(actors, order):
+    """Flood one chat while a quiet chat sends one update"""
+    flood_gate = asyncio.Event()
+    
+    async def handle(chat_id, n):
+        order.append((chat_id, n))
+        if chat_id == "flood":
+            await flood_gate.wait()
+        return n
+    
+    flood = [asyncio.ensure_future(actors.submit("flood", handle("flood", n))) for n in range(10)]
+    await asyncio.sleep(0)
+    
+    # The flood holds one of the two slots, so the quiet chat runs at once
+    quiet = await actors.submit("quiet", handle("quiet", 0))
+    flood_gate.set()
+    results = await asyncio.gather(*flood, return_exceptions=True)
+    return quiet, results
+
+def test_backlog():
+    """A flooding chat holds one shared slot and can't grow without bound"""
+    actors = ChatActors(max_mailbox=3, semaphore=asyncio.BoundedSemaphore(2))
+    order = []
+    quiet, results = asyncio.run(run_backlog(actors, order))
+    print(f"Order: {order}, stats: {actors.stats()}")
+    
+    # All ten arrived before the first ran: three were kept, the rest refused
+    assert quiet == 0
+    assert order[:2] == [("flood", 0), ("quiet", 0)]
+    assert results[:3] == [0, 1, 2]
+    assert all(isinstance(result, MailboxFull) for result in results[3:])
+    assert actors.dropped == 7
+
+def make_update(update_id, chat_id, user_id, text):
+    """A command update as PTB would deliver it"""
+    chat = Chat(chat_id, Chat.GROUP)
+    user = User(user_id, f"user{user_id}", False)
+    message = Message(update_id, datetime.now(), chat, from_user=user, text=text)
+    return Update(update_id, message=message)
+
+async def run_processor(processor, handled):
+    """Send a busy chat five updates, then a quiet chat one"""
+    gate = asyncio.Event()
+    
+    async def handle(update):
+        handled.append(update.update_id)
+        if update.effective_chat.id == 1:
+            await gate.wait()
+    
+    updates = [make_update(n, 1, 10, '/search') for n in range(1, 5)]
+    updates.append(make_update(5, 1, 11, '/spam'))
+    tasks = []
+    for update in updates:
+        tasks.append(asyncio.ensure_future(processor.process_update(update, handle(update))))
+        await asyncio.sleep(0.01)
+    
+    # Chat 1 holds one running slot however many of its updates wait
+    quiet = make_update(6, 2, 12, '/search')
+    await processor.process_update(quiet, handle(quiet))
+    handled_before_release = list(handled)
+    gate.set()
+    await asyncio.gather(*tasks)
+    return handled_before_release
+
+def test_processor():
+    """Admission runs before queueing and turned away updates get an answer"""
+    refused = []
+    handled = []
+    
+    async def admit(update):
+        return update.message.text != '/spam'
+    
+    async def on_overflow(update):
+        refused.append(update.update_id)
+    
+    processor = ChatUpdateProcessor(2, 2, admit=admit, on_overflow=on_overflow)
+    handled_before_release = asyncio.run(run_processor(processor, handled))
+    print(f"Handled: {handled}, refused: {refused}")
+    
+    assert processor.max_concurrent_updates > 1  # Application runs updates concurrently
+    assert handled_before_release == [1, 6]
+    assert handled == [1, 6, 2, 3]
+    assert refused == [4]  # The fourth found two waiting behind the first
+
+if __name__ == '__main__':
+    test_chat_actor()
+    test_backlog()
+    test_processor()
+    print("Chat actor test PASSED")
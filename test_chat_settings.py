@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Test that chat quality tiers survive a restart and stay bounded in memory
+"""
+
+import os
+import tempfile
+from bot.chat_settings import ChatSettings
+
+def run_restart(db_path):
+    """A tier set before a restart is read back after it"""
+    settings = ChatSettings(db_path, memory_size=2)
+    settings.set_quality(1, 'low')
+    settings.set_quality(2, 'high')
+    settings.set_quality(2, None)  # Back to the default
+    for chat_id in range(100, 110):
+        settings.get_quality(chat_id)
+    cached = settings.stats()['cached_chats']
+    settings.close()
+    
+    restarted = ChatSettings(db_path, memory_size=2)
+    qualities = [restarted.get_quality(chat_id) for chat_id in (1, 2, 3)]
+    restarted.get_quality(3)  # Chats without a row are remembered too
+    loads = restarted.stats()['loads']
+    restarted.close()
+    
+    print(f"Qualities after restart: {qualities}, cached before: {cached}, loads: {loads}")
+    assert qualities == ['low', None, None]
+    assert cached == 2
+    assert loads == 3
+
+def test_chat_settings():
+    """Test persistence and the memory bound of chat settings"""
+    with tempfile.TemporaryDirectory() as directory:
+        run_restart(os.path.join(directory, 'state.db'))
+
+if __name__ == '__main__':
+    test_chat_settings()
+    print("Chat settings test PASSED")
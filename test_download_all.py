@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the "Download all" button under search results
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+from bot import handlers
+from bot.cache import TTLCache
+
+class RecordingEditor:
+    """Stand-in for the status editor that records the last text per message"""
+    
+    def __init__(self):
+        self.texts = {}
+        self.markups = {}
+    
+    def edit(self, message, text, reply_markup=None, **kwargs):
+        self.texts[message.message_id] = text
+        self.markups[message.message_id] = reply_markup
+
+class StandInMessage:
+    def __init__(self, message_id):
+        self.chat_id = 42
+        self.message_id = message_id
+        self.replies = []
+    
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+        return StandInMessage(self.message_id + 1)
+
+class StandInSearch:
+    async def search_videos(self, query, max_results=5, max_duration=None):
+        return [
+            {'id': f"video{n:06d}", 'title': f"{query} {n}", 'duration': 180,
+             'url': f"https://youtube.com/watch?v=video{n:06d}"}
+            for n in range(max_results)
+        ]
+
+def make_press(message, data):
+    """A callback query update for a button under a message"""
+    async def answer():
+        pass
+    
+    query = SimpleNamespace(data=data, message=message, answer=answer)
+    return SimpleNamespace(callback_query=query, effective_chat=SimpleNamespace(id=message.chat_id))
+
+async def run_download_all(editor, deliveries):
+    """Search, press "Download all" twice"""
+    command = StandInMessage(1)
+    update = SimpleNamespace(message=command, effective_chat=SimpleNamespace(id=42))
+    context = SimpleNamespace(args=['test', 'song'])
+    await handlers.search_handler(update, context)
+    
+    results_message = StandInMessage(2)
+    buttons = [row[0].callback_data for row in editor.markups[2].inline_keyboard]
+    stored = handlers.search_results.get((42, 2))
+    
+    await handlers.button_callback_handler(make_press(results_message, 'dlall'), context)
+    first_press = editor.texts[2]
+    await handlers.button_callback_handler(make_press(results_message, 'dlall'), context)
+    
+    print(f"Buttons: {buttons}, deliveries: {[len(songs) for songs in deliveries]}")
+    assert buttons[-1] == 'dlall'
+    assert len(stored) == 5
+    assert first_press == "💾 Sending 5 songs..."
+    # The results are taken out on the first press, so nothing is sent twice
+    assert len(deliveries) == 1
+    assert [song.id for song in deliveries[0]] == [f"video{n:06d}" for n in range(5)]
+    assert handlers.search_results.get((42, 2)) is None
+    assert editor.texts[2] == "❌ These results have expired. Please search again."
+
+def test_download_all():
+    """Test that the button sends the shown results once"""
+    editor = RecordingEditor()
+    deliveries = []
+    
+    def record_delivery(update, context, songs, message):
+        deliveries.append(songs)
+    
+    with patch.object(handlers, 'status_editor', editor), \
+            patch.object(handlers, 'youtube_service', StandInSearch()), \
+            patch.object(handlers, 'search_results', TTLCache(100, 3600)), \
+            patch.object(handlers, 'start_batch_delivery', record_delivery):
+        asyncio.run(run_download_all(editor, deliveries))
+
+if __name__ == '__main__':
+    test_download_all()
+    print("Download all test PASSED")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test download scheduler priorities, fairness between chats and position
+reporting
+"""
+
+import asyncio
+from bot.download_scheduler import DownloadScheduler, PRIORITY_INTERACTIVE, PRIORITY_PREFETCH
+
+async def run_dispatch_order():
+    """Interactive jobs go first, and chats take turns within a priority"""
+    scheduler = DownloadScheduler(1)
+    started = []
+    release = asyncio.Event()
+    
+    def job(name):
+        async def run():
+            started.append(name)
+            if name == 'busy':
+                await release.wait()
+            return name
+        return run
+    
+    # Hold the only worker so everything else queues up
+    jobs = [asyncio.ensure_future(scheduler.submit(job('busy'), chat_id='x'))]
+    await asyncio.sleep(0.01)
+    
+    jobs.append(asyncio.ensure_future(scheduler.submit(job('pre'), chat_id='b', priority=PRIORITY_PREFETCH)))
+    for n in range(3):
+        jobs.append(asyncio.ensure_future(scheduler.submit(job(f'a{n}'), chat_id='a')))
+    jobs.append(asyncio.ensure_future(scheduler.submit(job('b0'), chat_id='b', priority=PRIORITY_INTERACTIVE)))
+    jobs.append(asyncio.ensure_future(scheduler.submit(job('c0'), chat_id='c')))
+    await asyncio.sleep(0.01)
+    
+    release.set()
+    await asyncio.gather(*jobs)
+    
+    print(f"Start order: {started}, stats: {scheduler.stats()}")
+    assert started == ['busy', 'a0', 'b0', 'c0', 'a1', 'a2', 'pre']
+
+async def run_positions():
+    """Waiting callers hear their position, and a cancelled one leaves the line"""
+    scheduler = DownloadScheduler(1)
+    release = asyncio.Event()
+    positions = {name: [] for name in ('first', 'second', 'third')}
+    
+    def reporter(name):
+        async def report(position):
+            positions[name].append(position)
+        return report
+    
+    async def hold():
+        await release.wait()
+    
+    async def quick():
+        return None
+    
+    busy = asyncio.ensure_future(scheduler.submit(hold, chat_id='x'))
+    await asyncio.sleep(0.01)
+    waiting = {
+        name: asyncio.ensure_future(scheduler.submit(quick, chat_id=name, on_position=reporter(name)))
+        for name in positions
+    }
+    await asyncio.sleep(0.01)
+    
+    waiting['first'].cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(busy, waiting['second'], waiting['third'])
+    
+    print(f"Positions reported: {positions}, stats: {scheduler.stats()}")
+    assert positions['first'] == [1]
+    assert positions['second'] == [2, 1]
+    assert positions['third'] == [3, 2, 1]
+    assert scheduler.queued() == 0
+
+def test_download_scheduler():
+    """Test priority order, round-robin fairness and position reporting"""
+    asyncio.run(run_dispatch_order())
+    asyncio.run(run_positions())
+
+if __name__ == '__main__':
+    test_download_scheduler()
+    print("Download scheduler test PASSED")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Test size-aware audio format selection on a typical YouTube format list
+"""
+
+from bot.format_selector import select_audio_format, baseline_format, estimate_size
+
+FORMATS = [
+    {'format_id': '139', 'ext': 'm4a', 'acodec': 'mp4a.40.5', 'vcodec': 'none', 'abr': 48.8},
+    {'format_id': '140', 'ext': 'm4a', 'acodec': 'mp4a.40.2', 'vcodec': 'none', 'abr': 129.5},
+    {'format_id': '249', 'ext': 'webm', 'acodec': 'opus', 'vcodec': 'none', 'abr': 50.2},
+    {'format_id': '251', 'ext': 'webm', 'acodec': 'opus', 'vcodec': 'none', 'abr': 135.1},
+    {'format_id': '18', 'ext': 'mp4', 'acodec': 'mp4a.40.2', 'vcodec': 'avc1', 'tbr': 500.0},
+]
+DURATION = 240
+
+def test_format_selector():
+    """Test that each tier gets the smallest playable format meeting it"""
+    low = select_audio_format(FORMATS, DURATION, 'low')
+    standard = select_audio_format(FORMATS, DURATION, 'standard')
+    baseline = baseline_format(FORMATS)
+    
+    print(f"low: {low['format_id']}, standard: {standard['format_id']}, baseline: {baseline['format_id']}")
+    assert low['format_id'] == '139'
+    assert standard['format_id'] == '140'
+    
+    saved = estimate_size(baseline, DURATION) - estimate_size(low, DURATION)
+    print(f"Low tier saves {saved} bytes on a {DURATION}s track")
+    assert saved > 0
+    
+    # The size ceiling wins over the tier
+    small = select_audio_format(FORMATS, DURATION, 'high', max_bytes=2 * 1024 * 1024)
+    assert small['format_id'] == '139'
+    assert select_audio_format(FORMATS, DURATION, 'high', max_bytes=1024) is None
+
+if __name__ == '__main__':
+    test_format_selector()
+    print("Format selector test PASSED")
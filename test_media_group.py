@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test that tracks are sent as albums and fall back to one by one
+"""
+
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+from telegram.error import BadRequest, NetworkError, TimedOut
+from bot.media_group import GroupTrack, send_audio_group, split_albums
+from bot.song import Song
+
+class RecordingBot:
+    """Stand-in for a telegram.Bot that records what it sends"""
+    
+    def __init__(self, stale_file_ids=(), album_error=None):
+        self.stale_file_ids = set(stale_file_ids)
+        self.album_error = album_error
+        self.groups = []
+        self.singles = []
+    
+    def _audio(self, name):
+        return SimpleNamespace(file_id=f"sent-{name}", file_size=1, duration=60)
+    
+    async def send_media_group(self, chat_id, media):
+        if self.album_error:
+            raise self.album_error
+        if any(item.media in self.stale_file_ids for item in media):
+            raise BadRequest("Wrong file identifier")
+        self.groups.append(len(media))
+        return [SimpleNamespace(audio=self._audio(item.title)) for item in media]
+    
+    async def send_audio(self, chat_id, audio, title, **kwargs):
+        if audio in self.stale_file_ids:
+            raise BadRequest("Wrong file identifier")
+        self.singles.append(title)
+        return SimpleNamespace(audio=self._audio(title))
+
+def make_tracks(directory):
+    """One cached track and two downloaded ones"""
+    tracks = [GroupTrack(Song("cached", "Cached", 60), file_id="old-file-id")]
+    for name in ("one", "two"):
+        path = os.path.join(directory, f"{name}.m4a")
+        with open(path, 'wb') as f:
+            f.write(b"audio")
+        tracks.append(GroupTrack(Song(name, name.title(), 60), path=path))
+    return tracks
+
+async def run_album(directory):
+    """Mixed file IDs and files go out in one call"""
+    bot = RecordingBot()
+    tracks = make_tracks(directory)
+    sent = await send_audio_group(bot, 42, tracks)
+    
+    print(f"Album calls: {bot.groups}, single sends: {bot.singles}")
+    assert sent == 3
+    assert bot.groups == [3]
+    assert not bot.singles
+    assert all(t.audio for t in tracks)
+
+async def run_fallback(directory):
+    """A stale file ID costs only its own track"""
+    bot = RecordingBot(stale_file_ids={"old-file-id"})
+    tracks = make_tracks(directory)
+    sent = await send_audio_group(bot, 42, tracks)
+    
+    print(f"Sent {sent} of 3 after fallback: {bot.singles}")
+    assert sent == 2
+    assert bot.singles == ["One", "Two"]
+    assert tracks[0].rejected
+    assert tracks[0].audio is None
+
+async def run_network_fallback(directory):
+    """An album lost to a 413 or a timeout is sent track by track"""
+    for error in (NetworkError("Request Entity Too Large (413)"), TimedOut()):
+        bot = RecordingBot(album_error=error)
+        tracks = make_tracks(directory)
+        sent = await send_audio_group(bot, 42, tracks)
+        
+        print(f"Sent {sent} of 3 after {type(error).__name__}: {bot.singles}")
+        assert sent == 3
+        assert not tracks[0].rejected
+
+def run_split(directory):
+    """Albums are cut where the uploaded bytes would exceed the limit"""
+    tracks = make_tracks(directory) * 4  # 12 tracks, 8 of them files of 5 bytes
+    albums = split_albums(tracks, max_bytes=12)
+    sizes = [len(album) for album in albums]
+    
+    print(f"Album sizes: {sizes}")
+    assert sizes == [4, 3, 3, 2]
+
+def test_media_group():
+    """Test album delivery and per-track fallback"""
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run_album(directory))
+        asyncio.run(run_fallback(directory))
+        asyncio.run(run_network_fallback(directory))
+        run_split(directory)
+
+if __name__ == '__main__':
+    test_media_group()
+    print("Media group test PASSED")
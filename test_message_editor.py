@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test that status edits are coalesced and back off on RetryAfter
+"""
+
+import asyncio
+from types import SimpleNamespace
+from telegram.error import RetryAfter
+from bot.message_editor import MessageEditor
+
+class RecordingMessage:
+    """Stand-in for a telegram.Message that records its edits"""
+    
+    def __init__(self, flood_once: bool = False):
+        self.chat_id = 42
+        self.message_id = 1
+        self.chat = SimpleNamespace(type='private')
+        self.edits = []
+        self.flood_once = flood_once
+    
+    async def edit_text(self, text, **kwargs):
+        if self.flood_once:
+            self.flood_once = False
+            raise RetryAfter(1)
+        self.edits.append(text)
+
+async def run_coalescing():
+    """Fire a burst of progress edits at one message"""
+    editor = MessageEditor(min_interval=0.2, group_interval=0.5)
+    message = RecordingMessage()
+    
+    for percent in range(0, 101, 5):
+        editor.edit(message, f"Downloading... {percent}%")
+        await asyncio.sleep(0.01)
+    editor.edit(message, "Downloading... 100%")  # No-op
+    await editor.flush(message)
+    
+    print(f"Edits sent: {message.edits}")
+    print(f"Stats: {editor.stats()}")
+    assert len(message.edits) <= 3
+    assert message.edits[-1] == "Downloading... 100%"
+
+async def run_retry_after():
+    """Check that a flood-limited edit is retried after the wait"""
+    editor = MessageEditor(min_interval=0.0, group_interval=0.0)
+    message = RecordingMessage(flood_once=True)
+    
+    editor.edit(message, "📤 Sending")
+    await asyncio.sleep(0)
+    editor.edit(message, "✅ Sent")
+    await editor.flush(message)
+    
+    print(f"Edits after RetryAfter: {message.edits}")
+    assert message.edits == ["✅ Sent"]
+    assert editor.retry_after == 1
+
+def test_message_editor():
+    """Test coalescing and RetryAfter handling"""
+    asyncio.run(run_coalescing())
+    asyncio.run(run_retry_after())
+
+if __name__ == '__main__':
+    test_message_editor()
+    print("Message editor test PASSED")
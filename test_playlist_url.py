@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Test which YouTube URLs are queued as playlists
+"""
+
+from bot.utils import extract_playlist_id, is_playlist_url
+
+def test_playlist_url():
+    """Test playlist detection for playlist, video and mix URLs"""
+    playlist = "https://www.youtube.com/playlist?list=PLx0sYbCqOb8TBPRdmBHs5Iftvv9TPboYG"
+    assert is_playlist_url(playlist)
+    assert extract_playlist_id(playlist) == "PLx0sYbCqOb8TBPRdmBHs5Iftvv9TPboYG"
+    assert is_playlist_url("youtube.com/playlist?list=OLAK5uy_abc")
+    
+    # A video opened from a playlist plays that video
+    assert not is_playlist_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLx0sYbCqOb8")
+    assert not is_playlist_url("https://youtu.be/dQw4w9WgXcQ?list=PLx0sYbCqOb8")
+    
+    # Mixes and uploads lists are generated per viewer
+    assert not is_playlist_url("https://www.youtube.com/playlist?list=RDdQw4w9WgXcQ")
+    assert not is_playlist_url("https://www.youtube.com/playlist?list=ULdQw4w9WgXcQ")
+    assert extract_playlist_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=RDMM") is None
+    
+    assert not is_playlist_url("https://example.com/playlist?list=PLx0sYbCqOb8")
+    assert not is_playlist_url("never gonna give you up")
+
+if __name__ == '__main__':
+    test_playlist_url()
+    print("Playlist URL test PASSED")
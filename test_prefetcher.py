@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test that prefetching never puts the playing song at prefetch priority
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+from bot.download_scheduler import DownloadScheduler
+from bot.prefetcher import Prefetcher
+from bot.song import Song
+from bot.youtube_service import YouTubeService
+from config import Config
+
+class StandInDownloads:
+    """Replaces the yt-dlp step with files that finish on demand"""
+    
+    def __init__(self):
+        self.gates = {}
+        self._lock = threading.Lock()
+    
+    def gate(self, video_id) -> threading.Event:
+        with self._lock:
+            return self.gates.setdefault(video_id, threading.Event())
+    
+    def __call__(self, video_id, quality, work_dir):
+        self.gate(video_id).wait(5)
+        path = os.path.join(work_dir, f"{video_id}.download.m4a")
+        with open(path, 'wb') as f:
+            f.write(b"a" * 1000)
+        return path
+
+def state_in(directory):
+    """Keep the service's database, cache and work files in a test directory"""
+    return patch.multiple(
+        Config,
+        TEMP_DIR=os.path.join(directory, 'temp'),
+        STATE_DB_PATH=os.path.join(directory, 'melody.db'),
+        AUDIO_CACHE_DIR=os.path.join(directory, 'cache'),
+        AUDIO_CACHE_MAX_BYTES=10 ** 9
+    )
+
+def make_service():
+    """A YouTubeService with one download worker and local stand-in files"""
+    service = YouTubeService()
+    service.download_scheduler = DownloadScheduler(1)
+    downloads = StandInDownloads()
+    service._download_audio_sync = downloads
+    
+    submissions = []
+    submit = service.download_scheduler.submit
+    
+    async def recording_submit(func, **kwargs):
+        submissions.append((kwargs['key'][0], kwargs['priority']))
+        return await submit(func, **kwargs)
+    
+    service.download_scheduler.submit = recording_submit
+    return service, downloads, submissions
+
+def dispatch_order(service):
+    return [job.key[0] for job in service.download_scheduler._dispatch_order()]
+
+async def run_prefetch_priority():
+    """Queue songs the way add_song and /skip do and check the order"""
+    service, downloads, submissions = make_service()
+    prefetcher = Prefetcher(service, lookahead=1, max_bytes=10 ** 9)
+    positions = []
+    
+    async def report(position):
+        positions.append(position)
+    
+    # Another chat's download holds the only worker
+    tasks = [asyncio.ensure_future(service.download_audio('busy', chat_id=1))]
+    await asyncio.sleep(0.05)
+    
+    # Another chat's prefetch is already waiting
+    prefetcher.sync(4, [Song('other-now', 'Other', 60), Song('other-next', 'Other next', 60)])
+    await asyncio.sleep(0)
+    
+    # A button press queues a song at position 0 and starts its delivery
+    prefetcher.sync(2, [Song('now', 'Now', 60), Song('next', 'Next', 60)])
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(service.download_audio('rival', chat_id=3)))
+    tasks.append(asyncio.ensure_future(service.download_audio('now', chat_id=2, on_position=report)))
+    await asyncio.sleep(0.05)
+    
+    print(f"Submissions: {submissions}")
+    assert ('now', 1) not in submissions
+    assert ('now', 0) in submissions
+    
+    # After /skip the prefetched next song is sent while still queued
+    tasks.append(asyncio.ensure_future(service.download_audio('next', chat_id=2, on_position=report)))
+    await asyncio.sleep(0.05)
+    order = dispatch_order(service)
+    print(f"Dispatch order: {order}, positions reported: {positions}")
+    assert order == ['rival', 'now', 'next', 'other-next']
+    assert len(positions) >= 2
+    
+    for video_id in ('busy', 'rival', 'now', 'next', 'other-next'):
+        downloads.gate(video_id).set()
+    paths = await asyncio.gather(*tasks)
+    for path in paths:
+        service.release_audio(path)
+    await asyncio.sleep(0.05)
+    prefetcher.sync(2, [])
+    prefetcher.sync(4, [])
+    
+    assert prefetcher.pinned_bytes == 0
+
+def test_prefetcher():
+    """Test that interactive downloads keep their priority"""
+    with tempfile.TemporaryDirectory() as directory, state_in(directory):
+        asyncio.run(run_prefetch_priority())
+
+if __name__ == '__main__':
+    test_prefetcher()
+    print("Prefetcher test PASSED")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the array-backed queue against a plain list model
+"""
+
+import random
+from bot.queue_manager import QueueManager
+from bot.song import Song
+
+def test_queue_manager():
+    """Apply random operations to both and compare after every step"""
+    rng = random.Random(7)
+    queue = QueueManager(max_size=500)
+    model = []
+    
+    for step in range(20000):
+        op = rng.random()
+        if op < 0.4 and len(model) < 500:
+            song = Song(f"v{step}", f"Song {step}", rng.randint(1, 600))
+            assert queue.add_song(song) == len(model)
+            model.append(song)
+        elif op < 0.7:
+            expected = model.pop(0) if model else None
+            assert queue.skip_song() is expected
+        elif op < 0.85:
+            index = rng.randint(-1, len(model))
+            expected = model.pop(index) if 0 <= index < len(model) else None
+            assert queue.remove_song(index) is expected
+        else:
+            src, dst = rng.randint(0, len(model)), rng.randint(0, len(model))
+            ok = 0 < src < len(model) and 0 <= dst < len(model) and src != dst
+            if ok:
+                model.insert(dst, model.pop(src))
+            assert queue.move_song(src, dst) == ok
+        
+        assert queue.get_queue() == model
+        info = queue.get_queue_info()
+        assert info['total_songs'] == len(model)
+        assert info['queue_duration'] == sum(song.duration for song in model)
+    
+    print(f"20000 operations matched, {len(queue.queue)} slots for {len(queue)} songs")
+
+def test_bulk_add():
+    """Test playlist-style bulk adds and discards"""
+    changes = []
+    queue = QueueManager(max_size=10, on_change=changes.append)
+    queue.add_song(Song("first", "First", 100))
+    
+    playlist = [Song(f"p{i}", f"Track {i}", 60) for i in range(15)]
+    assert queue.add_songs(playlist) == (1, 9)  # One check, truncated to fit
+    assert len(queue) == 10 and queue.total_duration == 100 + 9 * 60
+    assert len(changes) == 2  # One notice for the whole batch
+    
+    assert queue.discard_songs({"first", "p0", "p5"}) == 2  # Current song stays
+    assert [song.id for song in queue.peek(3)] == ["first", "p1", "p2"]
+    assert queue.total_duration == 100 + 7 * 60
+    
+    full = QueueManager(max_size=1)
+    full.add_song(Song("a", "A"))
+    try:
+        full.add_songs([Song("b", "B")])
+        assert False, "full queue accepted songs"
+    except Exception as e:
+        assert "full" in str(e)
+
+if __name__ == '__main__':
+    test_queue_manager()
+    test_bulk_add()
+    print("Queue manager test PASSED")
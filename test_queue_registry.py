@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test that idle chat queues leave memory and come back intact
+"""
+
+import asyncio
+import os
+import tempfile
+from bot.queue_manager import QueueManager
+from bot.queue_registry import QueueRegistry
+from bot.queue_store import QueueStore
+from bot.song import Song
+
+async def run_registry(db_path: str):
+    """Fill more chats than may stay resident, then revisit the first"""
+    store = QueueStore(db_path, flush_interval=0.05)
+    evicted = []
+    registry = QueueRegistry(
+        lambda chat_id: QueueManager(chat_id, on_change=store.mark_dirty),
+        store,
+        max_resident=3,
+        idle_timeout=3600,
+        on_evict=evicted.append
+    )
+    
+    for chat_id in range(10):
+        queue = registry.get(chat_id)
+        for i in range(3):
+            queue.add_song(Song(f"c{chat_id}s{i}", f"Chat {chat_id} song {i}", 60))
+    
+    # Evicted before its write-behind flush: served from pending changes
+    early = registry.get(0)
+    print(f"Revisited before flush: {len(early)} songs")
+    
+    # Chat 7 was evicted too; once flushed it comes back from SQLite
+    await asyncio.sleep(0.2)
+    late = registry.get(7)
+    print(f"Revisited after flush: {[song.id for song in late.get_queue()]}")
+    print(f"Evicted: {evicted}, stats: {registry.stats()}")
+    
+    await store.close()
+    
+    assert len(registry) == 3
+    assert len(early) == 3
+    assert [song.id for song in late.get_queue()] == ["c7s0", "c7s1", "c7s2"]
+    assert late.total_duration == 180
+
+def test_queue_registry():
+    """Test LRU eviction and rehydration"""
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run_registry(os.path.join(directory, 'state.db')))
+
+if __name__ == '__main__':
+    test_queue_registry()
+    print("Queue registry test PASSED")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test that queues survive a restart and writes are batched
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from bot.queue_manager import QueueManager
+from bot.queue_store import QueueStore
+from bot.song import Song
+
+async def run_persistence(db_path: str):
+    """Mutate queues, restart the store and restore them lazily"""
+    store = QueueStore(db_path, flush_interval=0.05)
+    radio = QueueManager(-100, on_change=store.mark_dirty, max_size=2000)
+    small = QueueManager(7, on_change=store.mark_dirty)
+    
+    # Record which thread each batch is written on
+    write_threads = []
+    write = store._write
+    
+    def recording_write(batch):
+        write_threads.append(threading.get_ident())
+        write(batch)
+    
+    store._write = recording_write
+    
+    for i in range(2000):
+        radio.add_song(Song(f"radio{i:06d}", f"Radio song {i}", 200))
+    for i in range(5):
+        small.add_song(Song(f"small{i}", f"Small song {i}", 100))
+    radio.skip_song()
+    small.clear_queue()
+    written_inline = store.stats()['rows_written']
+    
+    await asyncio.sleep(0.2)
+    stats = store.stats()
+    print(f"2007 changes written as: {stats}")
+    await store.close()
+    
+    # Changes only mark queues dirty; batches are written off the event loop
+    assert written_inline == 0
+    assert 1 <= stats['batches'] <= 2
+    assert write_threads
+    assert threading.get_ident() not in write_threads
+    
+    # A fresh store stands in for the restarted bot
+    store = QueueStore(db_path)
+    restored = QueueManager(-100)
+    restored.restore(store.load(-100))
+    print(f"Restored {len(restored)} songs")
+    
+    assert [song.id for song in restored.get_queue()] == [song.id for song in radio.get_queue()]
+    assert restored.total_duration == radio.total_duration
+    assert store.load(7) == []
+    await store.close()
+
+def test_queue_store():
+    """Test write-behind batching and lazy restore"""
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run_persistence(os.path.join(directory, 'state.db')))
+
+if __name__ == '__main__':
+    test_queue_store()
+    print("Queue store test PASSED")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test that outgoing requests are throttled and sent in priority order
+"""
+
+import asyncio
+import time
+from bot.rate_limiter import OutboundRateLimiter
+
+async def run_priorities():
+    """Queue uploads, then a callback answer, and record the send order"""
+    limiter = OutboundRateLimiter(overall_rate=10)
+    sent = []
+    
+    async def request(name):
+        sent.append(name)
+        return True
+    
+    async def call(name, endpoint, chat_id=None):
+        data = {'chat_id': chat_id} if chat_id is not None else {}
+        return await limiter.process_request(request, (name,), {}, endpoint, data, None)
+    
+    started = time.monotonic()
+    uploads = [asyncio.create_task(call(f"upload{i}", 'sendAudio', 42)) for i in range(15)]
+    await asyncio.sleep(0)
+    answer = asyncio.create_task(call("answer", 'answerCallbackQuery'))
+    await asyncio.gather(*uploads, answer)
+    elapsed = time.monotonic() - started
+    
+    print(f"Send order: {sent}")
+    print(f"15 uploads + 1 answer at 10/s took {elapsed:.2f}s")
+    print(f"Stats: {limiter.stats()}")
+    await limiter.shutdown()
+    
+    # The first 10 go out as a burst; the answer jumps the remaining uploads
+    assert sent.index("answer") == 10
+    assert elapsed >= 0.5
+
+async def run_group_limit():
+    """A throttled group must not hold back a private chat"""
+    limiter = OutboundRateLimiter(overall_rate=100, group_per_minute=2)
+    sent = []
+    
+    async def request(name):
+        sent.append(name)
+        return True
+    
+    group = [
+        asyncio.create_task(limiter.process_request(
+            request, (f"group{i}",), {}, 'sendMessage', {'chat_id': -100}, None
+        ))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0.05)
+    await limiter.process_request(request, ("private",), {}, 'sendMessage', {'chat_id': 7}, None)
+    
+    print(f"Group limited order: {sent}")
+    blocked = not group[2].done()
+    await limiter.shutdown()
+    assert sent == ["group0", "group1", "private"]
+    assert blocked
+
+async def run_cancelled():
+    """Cancelled callers leave the line without reordering the others"""
+    limiter = OutboundRateLimiter(overall_rate=1)
+    sent = []
+    
+    async def request(name):
+        sent.append(name)
+        return True
+    
+    await limiter.process_request(request, ("first",), {}, 'sendMessage', {'chat_id': 1}, None)
+    waiting = {
+        name: asyncio.create_task(limiter.process_request(
+            request, (name,), {}, endpoint, {'chat_id': 1}, None
+        ))
+        for name, endpoint in (("upload", 'sendAudio'), ("message", 'sendMessage'),
+                               ("answer", 'answerCallbackQuery'))
+    }
+    await asyncio.sleep(0)
+    waiting["answer"].cancel()
+    await asyncio.sleep(0)
+    stats = limiter.stats()
+    await asyncio.gather(waiting["upload"], waiting["message"])
+    
+    print(f"Order after a cancel: {sent}, queued while waiting: {stats['queued']}")
+    await limiter.shutdown()
+    assert sent == ["first", "message", "upload"]
+    assert stats['queued'] == 2
+    assert limiter.stats()['queued'] == 0
+
+def test_rate_limiter():
+    """Test priority ordering, per-group limits and cancelled callers"""
+    asyncio.run(run_priorities())
+    asyncio.run(run_group_limit())
+    asyncio.run(run_cancelled())
+
+if __name__ == '__main__':
+    test_rate_limiter()
+    print("Rate limiter test PASSED")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Test per-user request admission
+"""
+
+import time
+from bot.request_limiter import RequestLimiter
+from bot.utils import rate_limit_key
+
+def test_request_limiter():
+    """Test burst, single warning, idle eviction and many users"""
+    limiter = RequestLimiter(per_minute=10)
+    key = rate_limit_key(1, 1)
+    
+    results = [limiter.check(key) for _ in range(13)]
+    print(f"13 requests: {results}")
+    assert all(allowed for allowed, _ in results[:10])
+    assert results[10] == (False, True)  # Told once...
+    assert results[11] == (False, False)  # ...then silently dropped
+    assert limiter.check(rate_limit_key(2, 1))[0]  # Other users unaffected
+    
+    # Keys idle long enough to refill are dropped
+    limiter.idle_after = 0.01
+    time.sleep(0.02)
+    limiter.check(rate_limit_key(3, 1))
+    assert limiter.stats()['tracked_keys'] == 1
+    
+    # Every user of a busy group gets a key of their own
+    limiter = RequestLimiter(per_minute=10)
+    admitted = [limiter.check(rate_limit_key(user_id, -100))[0] for user_id in range(50000)]
+    print(f"50000 users, stats: {limiter.stats()}")
+    assert all(admitted)
+    assert limiter.stats()['tracked_keys'] == 50000
+
+if __name__ == '__main__':
+    test_request_limiter()
+    print("Request limiter test PASSED")
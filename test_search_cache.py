@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test that repeated searches are answered from the search cache
+"""
+
+import asyncio
+import os
+import tempfile
+from unittest.mock import patch
+from bot.youtube_service import YouTubeService
+from config import Config
+
+class StandInSearch:
+    """Replaces the yt-dlp search with canned results"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, query, max_results, enrich=True, max_duration=None):
+        self.calls.append((query, max_results))
+        if query == 'nothing':
+            return []
+        return [
+            {'id': f"{query[:4]}{n}", 'title': f"{query} {n}", 'duration': 60}
+            for n in range(max_results)
+        ]
+
+async def run_search_cache():
+    """Search the same song in several spellings and with other options"""
+    service = YouTubeService()
+    search = StandInSearch()
+    service._search_videos_sync = search
+    
+    first = await service.search_videos('Never Gonna Give You Up', max_results=3)
+    again = await service.search_videos('  never gonna   give you UP ', max_results=3)
+    other_count = await service.search_videos('never gonna give you up', max_results=1)
+    
+    # Callers get copies, so changing one result list leaves the cache alone
+    first.clear()
+    cached = await service.search_videos('Never Gonna Give You Up', max_results=3)
+    
+    # Empty results may be errors, so they are searched again
+    await service.search_videos('nothing')
+    await service.search_videos('nothing')
+    
+    stats = service.search_cache_stats()
+    print(f"Searches run: {search.calls}, cache stats: {stats}")
+    assert len(again) == 3
+    assert cached == again
+    assert len(other_count) == 1
+    assert search.calls == [
+        ('Never Gonna Give You Up', 3),
+        ('never gonna give you up', 1),
+        ('nothing', 5),
+        ('nothing', 5)
+    ]
+    assert stats['entries'] == 2
+    assert stats['hits'] == 2
+
+def test_search_cache():
+    """Test query normalization, cache keys and copies of cached results"""
+    with tempfile.TemporaryDirectory() as directory, patch.multiple(
+        Config,
+        TEMP_DIR=os.path.join(directory, 'temp'),
+        STATE_DB_PATH=os.path.join(directory, 'melody.db'),
+        AUDIO_CACHE_DIR=os.path.join(directory, 'cache')
+    ):
+        asyncio.run(run_search_cache())
+
+if __name__ == '__main__':
+    test_search_cache()
+    print("Search cache test PASSED")
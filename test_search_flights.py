@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test that concurrent identical searches share one yt-dlp call
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+from bot.youtube_service import YouTubeService
+from config import Config
+
+class StandInSearch:
+    """Replaces the yt-dlp search with one that finishes on demand"""
+    
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = 0
+        self.fail = False
+    
+    def __call__(self, query, max_results, enrich=True, max_duration=None):
+        self.calls += 1
+        self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("search failed")
+        return [{'id': 'dQw4w9WgXcQ', 'title': query, 'duration': 212}]
+
+async def run_coalescing():
+    """Ten callers searching at once cause one search"""
+    service = YouTubeService()
+    search = StandInSearch()
+    service._search_videos_sync = search
+    
+    callers = [
+        asyncio.ensure_future(service.search_videos('never gonna give you up'))
+        for _ in range(10)
+    ]
+    await asyncio.sleep(0.05)
+    search.gate.set()
+    results = await asyncio.gather(*callers)
+    
+    print(f"Searches run: {search.calls}, stats: {service.search_cache_stats()}")
+    assert search.calls == 1
+    assert service.search_cache_stats()['coalesced'] == 9
+    assert all(result == results[0] and len(result) == 1 for result in results)
+    # Each caller owns its list
+    assert len({id(result) for result in results}) == 10
+
+async def run_cancelled_caller():
+    """A cancelled caller doesn't cancel the search its peers wait for"""
+    service = YouTubeService()
+    search = StandInSearch()
+    service._search_videos_sync = search
+    
+    leaving = asyncio.ensure_future(service.search_videos('shared'))
+    staying = asyncio.ensure_future(service.search_videos('shared'))
+    await asyncio.sleep(0.05)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    search.gate.set()
+    
+    print(f"Cancelled: {leaving.cancelled()}, searches run: {search.calls}")
+    assert len(await staying) == 1
+    assert leaving.cancelled()
+    assert search.calls == 1
+
+async def run_failure():
+    """A failed search reaches every waiting caller, and the next call retries"""
+    service = YouTubeService()
+    search = StandInSearch()
+    search.fail = True
+    service._search_videos_sync = search
+    
+    callers = [asyncio.ensure_future(service.search_videos('broken')) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    search.gate.set()
+    results = await asyncio.gather(*callers)
+    
+    search.fail = False
+    retried = await service.search_videos('broken')
+    
+    print(f"Results after a failure: {results}, retry: {retried}")
+    assert results == [[], [], []]
+    assert len(retried) == 1
+    assert search.calls == 2
+
+def test_search_flights():
+    """Test search coalescing, cancellation and failures"""
+    for run in (run_coalescing, run_cancelled_caller, run_failure):
+        with tempfile.TemporaryDirectory() as directory, patch.multiple(
+            Config,
+            TEMP_DIR=os.path.join(directory, 'temp'),
+            STATE_DB_PATH=os.path.join(directory, 'melody.db'),
+            AUDIO_CACHE_DIR=os.path.join(directory, 'cache')
+        ):
+            asyncio.run(run())
+
+if __name__ == '__main__':
+    test_search_flights()
+    print("Search single-flight test PASSED")
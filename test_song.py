@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Test that shared songs are only built from resolved video info
+"""
+
+from bot.song import Song
+
+def test_song():
+    """Test sharing of resolved songs and isolation of partial entries"""
+    partial = Song.from_info({'id': 'late', 'title': 'Late', 'duration': None})
+    full = Song.from_info({'id': 'late', 'title': 'Late', 'duration': 7200, 'uploader': 'Channel'})
+    again = Song.from_info({'id': 'late', 'title': 'Late', 'duration': 7200})
+    
+    # The partial entry doesn't stand in for the full info
+    assert partial.duration == 0
+    assert full.duration == 7200
+    assert full.uploader == 'Channel'
+    assert again is full
+    
+    # A partial entry reuses a resolved song when there is one
+    assert Song.from_info({'id': 'late', 'title': 'Late'}) is full
+    assert Song.from_info(full) is full
+
+if __name__ == '__main__':
+    test_song()
+    print("Song test PASSED")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test that the SQLite-backed stores share one state database
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+from bot.chat_settings import ChatSettings
+from bot.file_id_cache import FileIdCache
+from bot.metadata_store import MetadataStore
+from bot.queue_store import QueueStore
+
+def test_sqlite_store():
+    """Test that every store creates its table and reads back what it wrote"""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'state', 'melody.db')
+        
+        file_ids = FileIdCache(db_path)
+        file_ids.put('v1', 'm4a', 'file-1', file_size=10, duration=60)
+        metadata = MetadataStore(db_path, max_age=3600)
+        metadata.put('v1', {'id': 'v1', 'title': 'Song'})
+        settings = ChatSettings(db_path)
+        settings.set_quality(1, 'high')
+        queues = QueueStore(db_path)
+        for store in (file_ids, metadata, settings):
+            store.close()
+        asyncio.run(queues.close())
+        
+        with sqlite3.connect(db_path) as conn:
+            journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        print(f"Journal mode: {journal_mode}, tables: {sorted(tables)}")
+        assert journal_mode == 'wal'
+        assert tables == {'telegram_files', 'video_metadata', 'chat_settings', 'chat_queues'}
+        
+        # Fresh stores have cold memory caches, so these reads hit SQLite
+        assert FileIdCache(db_path).get('v1', 'm4a')['file_id'] == 'file-1'
+        assert MetadataStore(db_path, max_age=3600).get('v1')['title'] == 'Song'
+        assert ChatSettings(db_path).get_quality(1) == 'high'
+        assert QueueStore(db_path).load(1) == []
+
+if __name__ == '__main__':
+    test_sqlite_store()
+    print("SQLite store test PASSED")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the streaming upload path against local stand-ins for the media
+host and the Telegram Bot API
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from telegram import Bot, InputFile
+from bot.streaming import spool_audio
+
+AUDIO_BYTES = bytes(range(256)) * 4096  # 1 MB of fake audio
+TOKEN = '123456:TEST'
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves the audio file and answers sendAudio like the Bot API"""
+    
+    uploads = []
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/mp4')
+        self.send_header('Content-Length', str(len(AUDIO_BYTES)))
+        self.end_headers()
+        self.wfile.write(AUDIO_BYTES)
+    
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        StandInHandler.uploads.append(body)
+        
+        result = {
+            'message_id': 1,
+            'date': 0,
+            'chat': {'id': 42, 'type': 'private'},
+            'audio': {
+                'file_id': 'stand-in-file-id',
+                'file_unique_id': 'stand-in',
+                'duration': 60,
+                'file_size': len(AUDIO_BYTES)
+            }
+        }
+        payload = json.dumps({'ok': True, 'result': result}).encode()
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+async def run_streaming_upload(port: int):
+    """Spool from the media stand-in and upload to the Bot API stand-in"""
+    spool = await spool_audio(
+        f"http://127.0.0.1:{port}/audio.m4a",
+        max_memory=2 * len(AUDIO_BYTES)
+    )
+    
+    with spool:
+        # Small tracks must never touch the disk
+        in_memory = not spool._rolled
+        print(f"Spooled in memory: {in_memory}")
+        
+        bot = Bot(TOKEN, base_url=f"http://127.0.0.1:{port}/bot")
+        message = await bot.send_audio(
+            chat_id=42,
+            audio=InputFile(spool.read(), filename='track.m4a')
+        )
+    
+    uploaded = StandInHandler.uploads[-1]
+    print(f"Upload body: {len(uploaded)} bytes, file ID: {message.audio.file_id}")
+    
+    assert in_memory
+    assert AUDIO_BYTES in uploaded
+    assert message.audio.file_id == 'stand-in-file-id'
+
+def test_streaming_upload():
+    """Test streaming from a media URL into a Bot API upload"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    try:
+        asyncio.run(run_streaming_upload(server.server_address[1]))
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    test_streaming_upload()
+    print("Streaming upload test PASSED")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test that YoutubeDL instances are reused and never shared between threads
+"""
+
+import threading
+from bot.ytdl_pool import YoutubeDLPool
+
+PROFILES = {
+    'search': {'quiet': True, 'no_warnings': True, 'extract_flat': True},
+    'info': {'quiet': True, 'no_warnings': True}
+}
+
+def test_reuse():
+    """A returned instance is handed out again for its own profile only"""
+    pool = YoutubeDLPool(PROFILES, max_idle=2)
+    pool.warm()
+    
+    with pool.checkout('search') as first:
+        pass
+    with pool.checkout('search') as second:
+        pass
+    with pool.checkout('info') as info:
+        pass
+    
+    stats = pool.stats()
+    print(f"Pool stats: {stats}")
+    assert second is first
+    assert info is not first
+    assert first.params['extract_flat'] is True
+    assert 'extract_flat' not in info.params
+    assert stats['created'] == 2
+    assert stats['reused'] == 3
+    pool.close()
+    assert pool.stats()['idle'] == {'search': 0, 'info': 0}
+
+def test_threads():
+    """Concurrent callers each get their own instance, and extras are closed"""
+    pool = YoutubeDLPool(PROFILES, max_idle=2)
+    barrier = threading.Barrier(6)
+    held = []
+    lock = threading.Lock()
+    
+    def call():
+        with pool.checkout('info') as ytdl:
+            with lock:
+                held.append(ytdl)
+            # Every thread holds its instance at the same time
+            barrier.wait(5)
+    
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    stats = pool.stats()
+    print(f"Instances handed out: {len(set(map(id, held)))}, stats: {stats}")
+    assert len({id(ytdl) for ytdl in held}) == 6
+    assert stats['created'] == 6
+    assert stats['idle']['info'] == 2
+    pool.close()
+
+if __name__ == '__main__':
+    test_reuse()
+    test_threads()
+    print("YoutubeDL pool test PASSED")